@@ -6,23 +6,28 @@ Integrates with OpenPose motion analysis data
 import cv2
 import os
 import asyncio
-import json
 import base64
 import numpy as np
+import orjson
+import msgpack
 import logging
+import time
 import uuid
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from functools import lru_cache
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple, Union
 import uvicorn
 from concurrent.futures import ThreadPoolExecutor
 
 # Pose detection imports
-from src.core.pose_detector import PoseDetector
-from src.core.posture_analyzer import PostureAnalyzer
+from src.core.pose_detector import PoseDetector, OpenVINOPoseDetector, ov
+from src.core.pose_batcher import PoseBatcher
+from src.core.posture_analyzer import PostureAnalyzer, EnergyLevel, EmotionCode
 from src.core.body_science import BodyScience
 from src.core.pose_buffer import CircularPoseBuffer
+from src.core.frame_buffers import FrameBufferPool
 
 # Backend service imports
 from src.services.coach_engine import CoachEngine
@@ -31,6 +36,8 @@ from src.services.gemini_ws import GeminiClient
 from src.services.feedback_manager import FeedbackManager, FeedbackType, FeedbackPriority
 from src.services.context_builder import ContextBuilder
 from src.services.voice_handler import VoiceHandler
+from src.services.frame_pipeline import FramePipeline
+from src.services.result_sender import LatestSender
 
 # Yoga coaching system
 from src.services.yoga_coach_engine import YogaCoachEngine
@@ -44,10 +51,31 @@ from src.core.logger import MotionLogger
 
 from dotenv import load_dotenv
 
+# Optional GPU JPEG decoding
+try:
+    from nvidia import nvimgcodec
+except ImportError:
+    nvimgcodec = None
+
+# Optional libjpeg-turbo decoding into pooled frame buffers
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+except ImportError:
+    TurboJPEG = None
+
 load_dotenv()
 
 MEET_BASE_URL = os.getenv("MEET_BASE_URL")
 WEBSOCKET_BASE_URL = os.getenv("WEBSOCKET_BASE_URL")
+USE_NVIMGCODEC = os.getenv("USE_NVIMGCODEC", "0") == "1"
+
+# OpenPose model converted to OpenVINO IR, used instead of the Caffe model
+# when openvino is installed and CUDA is not available
+OPENVINO_MODEL = "openpose/models/pose/coco/pose_iter_440000.xml"
+OPENVINO_DEVICE = os.getenv("OPENVINO_DEVICE", "CPU")
+
+# JPEG start-of-image marker
+JPEG_SOI = b"\xff\xd8"
 
 # OpenPose keypoint names (COCO 18-point model)
 POSE_NAMES = [
@@ -59,7 +87,7 @@ POSE_NAMES = [
 
 # Configure logging with more detail
 logging.basicConfig(
-    level=logging.DEBUG,  # Changed to DEBUG for more visibility
+    level=getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
@@ -69,121 +97,256 @@ session_manager = SessionManager()
 video_meet_manager = None
 gemini_client = None
 pose_detector = None
+pose_batcher = None
 posture_analyzer = None
 voice_handler = None
-executor = ThreadPoolExecutor(max_workers=4)
+image_decoder = None  # nvimgcodec.Decoder when GPU decoding is enabled
+jpeg_decoder = None  # TurboJPEG when libjpeg-turbo is available
+# Thread pool for decode/pose/analysis work. Installed as the event loop's
+# default executor; each uvicorn worker process gets its own pool.
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "32"))
+executor = ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE)
+# JPEGs wider than twice this are decoded at 1/2, 1/4 or 1/8 size, staying
+# at least this wide (the pose network only sees 368x368)
+DECODE_MIN_WIDTH = int(os.getenv("DECODE_MIN_WIDTH", "640"))
+# Most analysis messages sent per second per client; newer results replace
+# unsent ones
+ANALYSIS_SEND_HZ = float(os.getenv("ANALYSIS_SEND_HZ", "10"))
+# Cross-connection pose batching: largest batch, and how long the first
+# frame of a batch waits for company
+POSE_BATCH_MAX = int(os.getenv("POSE_BATCH_MAX", "8"))
+POSE_BATCH_WAIT_MS = float(os.getenv("POSE_BATCH_WAIT_MS", "10"))
+# Frames between facial emotion model runs, per connection
+EMOTION_INTERVAL = int(os.getenv("EMOTION_INTERVAL", "15"))
 session_loggers = {}  # Track loggers per session
 session_pose_buffers = {}  # Track pose buffers per session
 session_feedback_managers = {}  # Track feedback managers per session
 session_context_builders = {}  # Track context builders per session
 
 
-def convert_to_serializable(obj):
-    """Convert numpy types to Python native types for JSON serialization"""
-    if isinstance(obj, np.ndarray):
+def _json_default(obj):
+    """orjson fallback for what it can't encode natively (e.g. non-contiguous arrays)"""
+    if isinstance(obj, (np.ndarray, np.generic)):
         return obj.tolist()
-    elif isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, dict):
-        return {key: convert_to_serializable(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_to_serializable(item) for item in obj]
-    elif isinstance(obj, tuple):
-        return tuple(convert_to_serializable(item) for item in obj)
-    return obj
-
-
-def decode_base64_frame(base64_str: str) -> Optional[np.ndarray]:
-    """Decode base64 image string to OpenCV frame"""
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def to_json_text(data: Any) -> str:
+    """
+    Serialize a WebSocket message with orjson
+    
+    NumPy arrays and scalars are encoded natively in C, so analysis results
+    need no recursive conversion pass first.
+    """
+    return orjson.dumps(
+        data, default=_json_default,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    ).decode()
+
+
+def _jpeg_reduction(width: int) -> int:
+    """Largest DCT-domain downscale (1, 2, 4 or 8) keeping the width at DECODE_MIN_WIDTH or more"""
+    denom = 1
+    while denom < 8 and width // (denom * 2) >= DECODE_MIN_WIDTH:
+        denom *= 2
+    return denom
+
+
+def decode_jpeg_bytes(img_data: bytes, buffers: Optional[FrameBufferPool] = None) -> Optional[Tuple[np.ndarray, int]]:
+    """
+    Decode raw JPEG bytes to OpenCV frame
+    
+    JPEGs go through libjpeg-turbo when it is available (cv2.imdecode
+    otherwise); with a buffer pool given, the frame is decoded in place into
+    a pooled array instead of a fresh allocation. Frames much wider than the
+    pose network needs are scaled down during the IDCT.
+    
+    Returns:
+        (frame, scale) - scale is how many times smaller than the JPEG the
+        frame was decoded (1 = full size); None if decoding failed
+    """
+    scale = 1
+    try:
+        if image_decoder is not None:
+            # JPEG decode runs on the GPU; the pose model takes host arrays,
+            # so copy back and match OpenCV's BGR channel order
+            nv_img = image_decoder.decode(img_data)
+            frame = None if nv_img is None else cv2.cvtColor(np.asarray(nv_img.cpu()), cv2.COLOR_RGB2BGR)
+        elif jpeg_decoder is not None and img_data[:2] == JPEG_SOI:
+            # libjpeg-turbo's SIMD decoder; other formats fall through to OpenCV
+            width, height, _, _ = jpeg_decoder.decode_header(img_data)
+            scale = _jpeg_reduction(width)
+            scaling_factor = (1, scale) if scale > 1 else None
+            if buffers is None:
+                frame = jpeg_decoder.decode(img_data, pixel_format=TJPF_BGR, scaling_factor=scaling_factor)
+            else:
+                frame = buffers.acquire((-(-height // scale), -(-width // scale), 3))
+                try:
+                    jpeg_decoder.decode(img_data, pixel_format=TJPF_BGR, scaling_factor=scaling_factor, dst=frame)
+                except Exception:
+                    buffers.release(frame)
+                    raise
+        else:
+            nparr = np.frombuffer(img_data, np.uint8)
+            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        
+        if frame is None:
+            logger.error("❌ Failed to decode frame: decoder returned None")
+            return None
+        
+        logger.debug("✅ Frame decoded successfully: %s", frame.shape)
+        return frame, scale
+    except Exception as e:
+        logger.error(f"❌ Failed to decode frame: {e}", exc_info=True)
+        return None
+
+
+def decode_base64_frame(base64_str: str, buffers: Optional[FrameBufferPool] = None) -> Optional[Tuple[np.ndarray, int]]:
+    """Decode base64 image string to OpenCV frame (see decode_jpeg_bytes)"""
     try:
         if ',' in base64_str:
             base64_str = base64_str.split(',')[1]
         
         img_data = base64.b64decode(base64_str)
-        nparr = np.frombuffer(img_data, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        if frame is None:
-            logger.error("❌ Failed to decode frame: cv2.imdecode returned None")
-        else:
-            logger.debug(f"✅ Frame decoded successfully: {frame.shape}")
-            
-        return frame
     except Exception as e:
         logger.error(f"❌ Failed to decode frame: {e}", exc_info=True)
         return None
+    
+    return decode_jpeg_bytes(img_data, buffers)
+
+
+def decode_frame_payload(payload: Union[bytes, str], buffers: Optional[FrameBufferPool] = None) -> Optional[Tuple[np.ndarray, int]]:
+    """Decode stage: raw JPEG bytes (msgpack clients) or a base64 data URL (JSON clients)"""
+    if isinstance(payload, str):
+        return decode_base64_frame(payload, buffers)
+    return decode_jpeg_bytes(payload, buffers)
+
+
+async def receive_message(websocket: WebSocket) -> Dict[str, Any]:
+    """
+    Receive one client message
+    
+    Binary messages are either a bare JPEG (a frame, nothing else to parse)
+    or a msgpack map carrying the frame as raw JPEG bytes; text messages are
+    the JSON protocol with base64 frames. Control messages (set_asana, end,
+    ...) go as msgpack or JSON. Keepalive is left to WebSocket-level ping/pong
+    (uvicorn's ws_ping_interval), which browsers answer on their own.
+    
+    Raises:
+        WebSocketDisconnect: The client disconnected
+        ValueError: The message could not be parsed
+    """
+    msg = await websocket.receive()
+    if msg["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(msg.get("code", 1000))
+    
+    data = msg.get("bytes")
+    if data is not None:
+        # A msgpack map can't start with the JPEG marker (0xff is fixint -1)
+        if data[:2] == JPEG_SOI:
+            return {"type": "frame", "frame": data}
+        message = msgpack.unpackb(data, raw=False)
+    else:
+        message = orjson.loads(msg["text"])
+    
+    if not isinstance(message, dict):
+        raise ValueError("message is not an object")
+    return message
+
+
+async def _detect_pose(frame: np.ndarray, scale: int = 1):
+    """
+    Pose stage: OpenPose keypoints for a decoded frame, batched across connections
+    
+    Keypoints are returned in the client's frame coordinates, undoing any
+    decode-time downscale, as an (18, 3) float32 array with NaN rows for
+    missing points.
+    """
+    points, points_prob = await pose_batcher.detect(frame)
+    if scale != 1:
+        points[:, :2] *= scale
+    return points
 
 
-def _process_frame_sync(frame: np.ndarray, frame_count: int) -> Dict[str, Any]:
+def _process_frame_sync(frame: np.ndarray, points: np.ndarray, frame_count: int,
+                        emotion_cache: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
-    Synchronous frame processing using OpenPose
+    Synchronous analysis of a frame's detected OpenPose keypoints
+    
+    emotion_cache is the connection's last facial emotion result; when given,
+    the face model only re-runs every EMOTION_INTERVAL frames.
     """
     try:
-        logger.debug(f"🔄 Processing frame {frame_count}...")
+        logger.debug("🔄 Processing frame %d...", frame_count)
         
-        # Detect pose
-        points, points_prob = pose_detector.detect(frame)
-        valid_keypoints = sum(1 for p in points if p is not None)
-        logger.debug(f"👤 Detected {valid_keypoints} keypoints")
+        # Keypoints arrive as an (18, 3) float32 array, NaN rows missing
+        kp_array = points
+        valid_keypoints = int(np.count_nonzero(~np.isnan(kp_array[:, 0])))
+        logger.debug("👤 Detected %d keypoints", valid_keypoints)
         
         # Analyze posture (may return None if insufficient keypoints)
-        posture = posture_analyzer.analyze_posture(points)
-        movement = posture_analyzer.analyze_movement(points)
-        activities = posture_analyzer.detect_activity(points)
-        emotion = posture_analyzer.analyze_facial_sentiment(frame, points)
+        posture = posture_analyzer.analyze_posture(kp_array)
+        movement = posture_analyzer.analyze_movement(kp_array)
+        activities = posture_analyzer.detect_activity(kp_array)
+        
+        # Facial emotion barely changes between frames; reuse the last result
+        # until EMOTION_INTERVAL frames have passed
+        if emotion_cache is not None and frame_count - emotion_cache.get("frame", -EMOTION_INTERVAL) < EMOTION_INTERVAL:
+            emotion = emotion_cache["emotion"]
+        else:
+            emotion = posture_analyzer.analyze_facial_sentiment(frame, points)
+            if emotion_cache is not None:
+                emotion_cache.update(frame=frame_count, emotion=emotion)
         
         # Log analysis results with None checks
-        posture_status = posture.get('status', 'Unknown') if posture else 'Insufficient Data'
-        movement_energy = movement.get('energy', 'Unknown') if movement else 'Insufficient Data'
-        logger.debug(f"📊 Posture: {posture_status}, Movement: {movement_energy}")
+        if logger.isEnabledFor(logging.DEBUG):
+            posture_status = posture.get('status', 'Unknown') if posture else 'Insufficient Data'
+            movement_energy = movement.get('energy', 'Unknown') if movement else 'Insufficient Data'
+            logger.debug("📊 Posture: %s, Movement: %s", posture_status, movement_energy)
         
         # Body Science calculations (may also return None)
-        joints = BodyScience.analyze_joints(points)
-        symmetry = BodyScience.analyze_symmetry(points)
-        cog_data = BodyScience.analyze_center_of_gravity(points)
+        joints, symmetry, cog_data = BodyScience.analyze_all(kp_array)
         
-        # Prepare analysis data with safe defaults for None values
+        # Prepare analysis data with safe defaults for None values. NumPy
+        # values are left as they are; to_json_text() serializes them natively.
+        # Keypoints stay packed: rows of [x, y, confidence], all null (NaN)
+        # for a missing point.
         frame_data = {
-            "frame_num": int(frame_count),
-            "timestamp": float(cv2.getTickCount() / cv2.getTickFrequency()),
-            "keypoints": [
-                {
-                    "x": float(p[0]), 
-                    "y": float(p[1]), 
-                    "confidence": float(p[2])
-                } if p is not None else None 
-                for p in points
-            ],
-            "joints": {k: float(v) for k, v in joints.items()} if joints else {},
-            "symmetry": {k: float(v) for k, v in symmetry.items()} if symmetry else {},
+            "frame_num": frame_count,
+            "timestamp": time.monotonic(),
+            "keypoints": kp_array,
+            "joints": joints,
+            "symmetry": symmetry,
             "balance": {
-                "cog": [float(cog_data['cog'][0]), float(cog_data['cog'][1])],
-                "balance_score": float(cog_data['balance_score'])
+                "cog": cog_data['cog'].tolist(),
+                "balance_score": cog_data['balance_score']
             } if cog_data else {"cog": [0, 0], "balance_score": 0},
             "posture": {
                 "status": posture['status'],
-                "angle": float(posture['angle']),
-                "shoulder_aligned": bool(posture['shoulder_aligned']) if posture.get('shoulder_aligned') is not None else None
+                "angle": posture['angle'],
+                "shoulder_aligned": posture['shoulder_aligned']
             } if posture else {"status": "Unknown", "angle": 0, "shoulder_aligned": None},
             "movement": {
                 "energy": movement['energy'],
+                "energy_level": int(movement['energy_level']),
                 "sentiment": movement.get('sentiment', 'Unknown'),
-                "movement_score": float(movement['movement_score']),
-                "velocity": float(movement['velocity'])
-            } if movement else {"energy": "Unknown", "sentiment": "Unknown", "movement_score": 0, "velocity": 0},
+                "movement_score": movement['movement_score'],
+                "velocity": movement['velocity']
+            } if movement else {"energy": "Unknown", "energy_level": int(EnergyLevel.UNKNOWN), "sentiment": "Unknown",
+                                "movement_score": 0, "velocity": 0},
             "emotion": {
                 "emotion": emotion['emotion'],
+                "code": int(emotion['code']),
                 "sentiment": emotion['sentiment'],
                 "confidence": int(emotion['confidence']),
                 "details": emotion.get('details', ''),
-                "all_emotions": {k: float(v) for k, v in emotion.get('all_emotions', {}).items()}
-            } if emotion else {"emotion": "Unknown", "sentiment": "Unknown", "confidence": 0, "details": "", "all_emotions": {}},
+                "all_emotions": emotion.get('all_emotions', {})
+            } if emotion else {"emotion": "Unknown", "code": int(EmotionCode.UNKNOWN), "sentiment": "Unknown",
+                               "confidence": 0, "details": "", "all_emotions": {}},
             "activities": activities if activities else []
         }
         
-        logger.debug(f"✅ Frame {frame_count} processed successfully")
+        logger.debug("✅ Frame %d processed successfully", frame_count)
         return frame_data
         
     except Exception as e:
@@ -191,34 +354,52 @@ def _process_frame_sync(frame: np.ndarray, frame_count: int) -> Dict[str, Any]:
         return None
 
 
-async def process_frame(frame: np.ndarray, frame_count: int) -> Optional[Dict[str, Any]]:
-    """
-    Process a single frame asynchronously
-    """
-    loop = asyncio.get_event_loop()
+async def cancel_tasks(*tasks: Optional[asyncio.Task]):
+    """Cancel a connection's background tasks and wait until they have finished"""
+    pending = [task for task in tasks if task is not None]
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+
+def create_result_sender(websocket: WebSocket) -> LatestSender:
+    """Analysis message sender for one WebSocket connection"""
+    async def send(message: Dict[str, Any]):
+        await websocket.send_text(to_json_text(message))
     
-    try:
-        frame_data = await loop.run_in_executor(
-            executor,
-            _process_frame_sync,
-            frame,
-            frame_count
-        )
-        return frame_data
-    except Exception as e:
-        logger.error(f"❌ Error in async frame processing: {e}", exc_info=True)
-        return None
+    # One-off feedback must survive its frame being coalesced away
+    return LatestSender(send, max_hz=ANALYSIS_SEND_HZ, carry_keys=("gemini", "coaching"))
+
+
+def create_frame_pipeline() -> FramePipeline:
+    """Decode -> pose -> analysis pipeline for one WebSocket connection"""
+    # Decoded frames travel the pipeline as (frame, scale) and go back to the
+    # connection's pool once analyzed
+    buffers = FrameBufferPool()
+    emotion_cache: Dict[str, Any] = {}
+    
+    async def detect(decoded: Tuple[np.ndarray, int]):
+        return await _detect_pose(*decoded)
+    
+    return FramePipeline(lambda payload: decode_frame_payload(payload, buffers),
+                         detect,
+                         lambda decoded, points, frame_count: _process_frame_sync(decoded[0], points, frame_count, emotion_cache),
+                         release=lambda decoded: buffers.release(decoded[0]))
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
-    global gemini_client, pose_detector, posture_analyzer, video_meet_manager, voice_handler
+    global gemini_client, pose_detector, pose_batcher, posture_analyzer, video_meet_manager, voice_handler, image_decoder, jpeg_decoder
     
     logger.info("=" * 60)
     logger.info("🚀 Starting AI Video Coach Backend with OpenPose")
     logger.info("=" * 60)
     
+    # asyncio.to_thread / run_in_executor(None, ...) use our sized pool
+    asyncio.get_running_loop().set_default_executor(executor)
+    logger.info(f"🧵 Thread pool: {THREAD_POOL_SIZE} workers")
+    
     # Initialize pose detector
     logger.info("🎥 Initializing OpenPose detector...")
     model_file = "openpose/models/pose/coco/pose_iter_440000.caffemodel"
@@ -228,9 +409,37 @@ async def lifespan(app: FastAPI):
         logger.error(f"Model not found at {model_file}")
         raise RuntimeError("Pose detection model not found")
     
-    pose_detector = PoseDetector(model_file, config_file, use_cuda=False)
+    use_cuda = cv2.cuda.getCudaEnabledDeviceCount() > 0
+    if not use_cuda and ov is not None and os.path.exists(OPENVINO_MODEL):
+        # Converted FP16/INT8 IR is the fastest option without CUDA
+        pose_detector = OpenVINOPoseDetector(OPENVINO_MODEL, device=OPENVINO_DEVICE)
+    else:
+        pose_detector = PoseDetector(model_file, config_file, use_cuda=use_cuda)
+    logger.info(f"🎥 Pose inference on {pose_detector.backend_name}")
+    
+    # Warm-up pass so the first real frame doesn't pay backend setup / cuDNN autotuning
+    pose_detector.detect(np.zeros((*pose_detector.input_size, 3), dtype=np.uint8))
+    
+    # Concurrent connections share forward passes
+    pose_batcher = PoseBatcher(pose_detector, max_batch=POSE_BATCH_MAX, max_wait_ms=POSE_BATCH_WAIT_MS)
+    pose_batcher.start()
+    
     posture_analyzer = PostureAnalyzer()
     
+    # GPU JPEG decoder for incoming frames (cv2.imdecode otherwise)
+    if USE_NVIMGCODEC:
+        if nvimgcodec is None:
+            logger.warning("⚠ USE_NVIMGCODEC is set but nvidia-nvimgcodec is not installed; using cv2.imdecode")
+        else:
+            image_decoder = nvimgcodec.Decoder()
+            logger.info("🖼️ Decoding frames on the GPU with nvImageCodec")
+    elif TurboJPEG is not None:
+        try:
+            jpeg_decoder = TurboJPEG()
+            logger.info("🖼️ Decoding frames with libjpeg-turbo")
+        except Exception as e:
+            logger.warning(f"⚠ libjpeg-turbo unavailable ({e}); using cv2.imdecode")
+    
     # Initialize Gemini client
     logger.info("🤖 Initializing Gemini AI...")
     gemini_client = GeminiClient()
@@ -250,6 +459,7 @@ async def lifespan(app: FastAPI):
     
     # Cleanup
     logger.info("🔄 Shutting down services...")
+    await pose_batcher.close()
     executor.shutdown(wait=True)
     await gemini_client.disconnect()
     logger.info("👋 Shutdown complete")
@@ -272,21 +482,25 @@ app.add_middleware(
 )
 
 
+# Static response bodies, serialized once
+ROOT_BODY = orjson.dumps({
+    "status": "healthy",
+    "service": "AI Video Coach Backend with OpenPose",
+    "version": "2.2.0",
+    "endpoints": {
+        "create_meeting": "POST /api/create-meeting",
+        "video_analysis": "{WEBSOCKET_BASE_URL}/ws/video-analysis",
+        "meeting_stream": "{WEBSOCKET_BASE_URL}/ws/meet/{session_id}",
+        "health": "/health",
+        "stats": "/stats"
+    }
+})
+
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": "AI Video Coach Backend with OpenPose",
-        "version": "2.2.0",
-        "endpoints": {
-            "create_meeting": "POST /api/create-meeting",
-            "video_analysis": "{WEBSOCKET_BASE_URL}/ws/video-analysis",
-            "meeting_stream": "{WEBSOCKET_BASE_URL}/ws/meet/{session_id}",
-            "health": "/health",
-            "stats": "/stats"
-        }
-    }
+    return Response(ROOT_BODY, media_type="application/json")
 
 
 @app.post("/api/create-meeting")
@@ -354,25 +568,24 @@ async def list_meetings():
     }
 
 
-@app.get("/api/asanas")
-async def list_available_asanas():
-    """List all available yoga asanas"""
-    asanas = list_asanas()
-    return {
+@lru_cache(maxsize=1)
+def _asana_list_body() -> bytes:
+    """Serialized asana list (the registry never changes at runtime)"""
+    return orjson.dumps({
         "success": True,
-        "asanas": asanas
-    }
+        "asanas": list_asanas()
+    })
 
 
-@app.get("/api/asana/{asana_id}")
-async def get_asana_info(asana_id: str):
-    """Get information about a specific asana"""
+@lru_cache(maxsize=128)
+def _asana_info_body(asana_id: str) -> Optional[bytes]:
+    """Serialized asana details, or None for an unknown id"""
     asana = get_asana(asana_id)
     
     if not asana:
-        raise HTTPException(status_code=404, detail="Asana not found")
+        return None
     
-    return {
+    return orjson.dumps({
         "success": True,
         "asana": {
             "id": asana_id,
@@ -398,7 +611,24 @@ async def get_asana_info(asana_id: str):
                 for rule in asana.alignment_rules
             ]
         }
-    }
+    })
+
+
+@app.get("/api/asanas")
+async def list_available_asanas():
+    """List all available yoga asanas"""
+    return Response(_asana_list_body(), media_type="application/json")
+
+
+@app.get("/api/asana/{asana_id}")
+async def get_asana_info(asana_id: str):
+    """Get information about a specific asana"""
+    body = _asana_info_body(asana_id)
+    
+    if body is None:
+        raise HTTPException(status_code=404, detail="Asana not found")
+    
+    return Response(body, media_type="application/json")
 
 
 @app.websocket("/ws/meet/{session_id}")
@@ -419,18 +649,15 @@ async def meet_websocket_endpoint(websocket: WebSocket, session_id: str):
     logger.info(f"👤 {participant_id} joined meeting {session_id}")
     
     # Create coaching session with unique ID
-    coaching_session_id = hash(f"{session_id}_{participant_id}")
+    coaching_session_id = participant_id  # Already unique per connection
     coaching_session = session_manager.create_session(coaching_session_id)
     
     # Initialize YOGA coach engine (deterministic)
-    yoga_coach = YogaCoachEngine(session_id=str(coaching_session_id))
+    yoga_coach = YogaCoachEngine(session_id=coaching_session_id)
     
     # Set default asana (can be changed via message)
     yoga_coach.set_asana('tree_pose')  # Default to Tree Pose
     
-    # Keep old coach for backward compatibility (optional)
-    coach = CoachEngine(coaching_session, gemini_client)
-    
     # Initialize NEW architecture components
     pose_buffer = CircularPoseBuffer(max_size=90)  # 3 seconds at 30 FPS
     feedback_manager = FeedbackManager(voice_cooldown=5.0, visual_cooldown=1.0)
@@ -446,16 +673,221 @@ async def meet_websocket_endpoint(websocket: WebSocket, session_id: str):
     session_loggers[participant_id] = motion_logger
     
     logger.info(f"📝 Logger initialized for {participant_id}: {motion_logger.log_path}")
-    motion_logger.log("="*80)
-    motion_logger.log("OpenPose Motion Detection System")
-    motion_logger.log("With Posture & Emotion Analysis")
-    motion_logger.log("="*80)
-    motion_logger.log(f"Session ID: {session_id}")
-    motion_logger.log(f"Participant: {participant_id}")
-    motion_logger.log("="*80)
+    motion_logger.log("\n".join([
+        "=" * 80,
+        "OpenPose Motion Detection System",
+        "With Posture & Emotion Analysis",
+        "=" * 80,
+        f"Session ID: {session_id}",
+        f"Participant: {participant_id}",
+        "=" * 80,
+    ]))
+    
+    async def request_gemini(context: Dict[str, Any]):
+        """Fetch Gemini feedback, then any context that was coalesced meanwhile"""
+        nonlocal gemini_latest_context, gemini_ready
+        
+        while context is not None:
+            frame_num = context["frame_num"]
+            try:
+                logger.debug("🔧 [MAIN] Calling gemini_client.send_coaching_request...")
+                # Get Gemini feedback
+                feedback = await gemini_client.send_coaching_request(context)
+                logger.debug("🔧 [MAIN] Gemini feedback received: %s", feedback)
+                
+                gemini_response = {
+                    "feedback": feedback,
+                    "frame_num": frame_num,
+                    "triggered": True
+                }
+                
+                # Log Gemini response
+                motion_logger.log("\n".join([
+                    f"\n[GEMINI AI COACH] Frame {frame_num:04d}",
+                    "-" * 80,
+                    f"  Response: {feedback}",
+                    "=" * 80,
+                ]))
+                
+                logger.info(f"🤖 Gemini: {feedback}")
+                
+                # Also include in coaching data for backward compatibility
+                coaching_data = {
+                    "triggered": True,
+                    "reason": "ai_analysis",
+                    "feedback": feedback
+                }
+                
+            except Exception as e:
+                logger.error(f"❌ Gemini error: {e}")
+                logger.error(f"❌ Error type: {type(e).__name__}")
+                logger.error(f"❌ Context summary: posture={context.get('posture', {}).get('status')}, movement={context.get('movement', {}).get('energy')}")
+                gemini_response = {
+                    "feedback": "Keep up the great work!",
+                    "frame_num": frame_num,
+                    "triggered": False,
+                    "error": str(e)
+                }
+                coaching_data = None
+            
+            gemini_ready = (gemini_response, coaching_data)
+            context, gemini_latest_context = gemini_latest_context, None
     
+    async def handle_frame_result(frame_count: int, frame_data: Dict[str, Any]):
+        """Coach, log and send one analyzed frame"""
+        nonlocal gemini_task, gemini_latest_context, gemini_ready
+        
+        # Update session
+        coaching_session.add_frame(frame_data)
+        coaching_session.update_metrics(frame_data)
+        
+        # ========================================
+        # UPDATE POSE BUFFER (New Architecture)
+        # ========================================
+        pose_buffer.push(frame_data)
+        
+        # Log comprehensive frame analysis
+        motion_logger.log_frame_analysis(
+            frame_num=frame_count,
+            points=frame_data["keypoints"],
+            points_names=POSE_NAMES,
+            joints=frame_data.get("joints", {}),
+            symmetry=frame_data.get("symmetry", {}),
+            cog_data=frame_data.get("balance", {}),
+            posture=frame_data.get("posture", {}),
+            movement=frame_data.get("movement", {}),
+            emotion=frame_data.get("emotion", {}),
+            activities=frame_data.get("activities", [])
+        )
+        
+        # ========================================
+        # YOGA COACH SYSTEM (Deterministic)
+        # ========================================
+        # Monotonic analysis time, so cooldowns don't jump with the wall clock
+        timestamp = frame_data["timestamp"]
+        
+        # Update yoga coach with frame data
+        yoga_decision = yoga_coach.update(frame_data, timestamp)
+        
+        # Log yoga coach decision
+        if yoga_decision.get('should_coach'):
+            motion_logger.log("\n".join([
+                f"\n[YOGA COACH] Frame {frame_count:04d}",
+                "-" * 80,
+                f"  Asana: {yoga_decision['asana']}",
+                f"  State: {yoga_decision['state']}",
+                f"  Error: {yoga_decision['error_code']}",
+                f"  Severity: {yoga_decision['severity']:.2f}",
+                f"  Priority: {yoga_decision['priority']}",
+                f"  Message: {yoga_decision['message']}",
+                "=" * 80,
+            ]))
+            logger.info(f"🧘 Yoga Coach: {yoga_decision['message']}")
+        
+        # Get Gemini response for EVERY frame (or configure interval)
+        gemini_response = None
+        coaching_data = None
+        
+        # Check every 30 frames for Gemini response (~3 seconds at 10 FPS)
+        if frame_count % 30 == 0:
+            logger.info("🤖 Requesting Gemini analysis for frame %d", frame_count)
+            logger.debug("🔧 [MAIN] Preparing context for Gemini...")
+            
+            # Build context for Gemini with actual movement data
+            context = {
+                "posture": frame_data.get("posture", {}),
+                "movement": frame_data.get("movement", {}),
+                "emotion": frame_data.get("emotion", {}),
+                "balance": frame_data.get("balance", {}),
+                "symmetry": frame_data.get("symmetry", {}),
+                "joints": frame_data.get("joints", {}),  # Added for specific joint feedback
+                "keypoints": frame_data["keypoints"],  # Packed (18, 3) array for position-based feedback
+                "frame_num": frame_count
+            }
+            
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🔧 [MAIN] Context prepared:")
+                logger.debug("  - Posture status: %s", context['posture'].get('status', 'Unknown'))
+                logger.debug("  - Movement energy: %s", context['movement'].get('energy', 'Unknown'))
+                logger.debug("  - Balance score: %s", context['balance'].get('balance_score', 0))
+                logger.debug("  - Joints count: %d", len(context['joints']))
+                logger.debug("  - Keypoints count: %d", int(np.count_nonzero(~np.isnan(context['keypoints'][:, 0]))))
+            
+            # Gemini runs off the frame path; while a request is in flight
+            # only the newest context is kept and sent once it returns
+            if gemini_task is None or gemini_task.done():
+                gemini_task = asyncio.create_task(request_gemini(context))
+            else:
+                gemini_latest_context = context
+        
+        # Attach a finished Gemini reply to this analysis message
+        if gemini_ready is not None:
+            gemini_response, coaching_data = gemini_ready
+            gemini_ready = None
+        
+        # Send analysis with yoga coach decision and optional Gemini
+        response_data = {
+            "type": "analysis",
+            "data": frame_data,
+            "dropped_frames": pipeline.frames_dropped  # Lets the client lower its capture rate
+        }
+        
+        # Add YOGA COACH decision (primary coaching system)
+        response_data["yoga_coach"] = yoga_decision
+        
+        # Add Gemini response if available (optional polishing)
+        if gemini_response:
+            response_data["gemini"] = gemini_response
+        
+        # Add coaching data for backward compatibility
+        if coaching_data:
+            response_data["coaching"] = coaching_data
+            logger.info("📤 Sending analysis WITH Gemini feedback")
+        elif yoga_decision.get('should_coach'):
+            logger.info("📤 Sending analysis WITH Yoga Coach feedback")
+        else:
+            logger.debug("📤 Sending analysis without feedback")
+        
+        sender.update(response_data)
+    
+    async def forward_results():
+        """Consume analyzed frames from the pipeline"""
+        while True:
+            frame_count, frame_data, error = await pipeline.get_result()
+            
+            if error == "decode":
+                logger.error(f"❌ Failed to decode frame {frame_count}")
+                await websocket.send_json({
+                    "type": "error",
+                    "message": "Failed to decode frame"
+                })
+                continue
+            
+            if frame_data is None:
+                logger.error(f"❌ Frame processing returned None for frame {frame_count}")
+                continue
+            
+            logger.info("✅ Frame %d processed successfully", frame_count)
+            if frame_count % 100 == 0:
+                logger.info("📈 Pipeline %s: %s", participant_id, pipeline.stats())
+            try:
+                await handle_frame_result(frame_count, frame_data)
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Error handling frame {frame_count}: {e}", exc_info=True)
+    
+    pipeline = create_frame_pipeline()
+    sender = create_result_sender(websocket)
+    results_task = None
     frame_count = 0
     
+    # Gemini request in flight, newest context waiting behind it, and a
+    # finished (gemini_response, coaching_data) not yet sent
+    gemini_task: Optional[asyncio.Task] = None
+    gemini_latest_context: Optional[Dict[str, Any]] = None
+    gemini_ready = None
+    
     try:
         await websocket.send_json({
             "type": "welcome",
@@ -466,16 +898,19 @@ async def meet_websocket_endpoint(websocket: WebSocket, session_id: str):
         
         logger.info(f"✅ Welcome message sent to {participant_id}")
         
+        pipeline.start()
+        sender.start()
+        results_task = asyncio.create_task(forward_results())
+        
         while True:
             try:
-                data = await websocket.receive_text()
-                message = json.loads(data)
-            except json.JSONDecodeError as e:
-                logger.error(f"❌ Invalid JSON received: {e}")
+                message = await receive_message(websocket)
+            except ValueError as e:
+                logger.error(f"❌ Invalid message received: {e}")
                 continue
             
             msg_type = message.get("type", "frame")
-            logger.debug(f"📨 Received message type: {msg_type}")
+            logger.debug("📨 Received message type: %s", msg_type)
             
             # Handle asana selection
             if msg_type == "set_asana":
@@ -557,186 +992,21 @@ async def meet_websocket_endpoint(websocket: WebSocket, session_id: str):
                 continue
             
             if msg_type == "frame":
-                frame_base64 = message.get("frame")
-                if not frame_base64:
+                frame_payload = message.get("frame")
+                if not frame_payload:
                     logger.warning("⚠️ Received frame message without frame data")
                     continue
                 
-                frame_count += 1
-                logger.info(f"🎬 Processing frame {frame_count} from {participant_id}")
-                
-                # Decode frame
-                frame = decode_base64_frame(frame_base64)
-                if frame is None:
-                    logger.error(f"❌ Failed to decode frame {frame_count}")
-                    await websocket.send_json({
-                        "type": "error",
-                        "message": "Failed to decode frame"
-                    })
-                    continue
-                
-                # Process frame with OpenPose
-                logger.debug(f"🔍 Starting OpenPose analysis for frame {frame_count}")
-                frame_data = await process_frame(frame, frame_count)
-                
-                if frame_data is None:
-                    logger.error(f"❌ Frame processing returned None for frame {frame_count}")
-                    continue
-                
-                logger.info(f"✅ Frame {frame_count} processed successfully")
-                
-                # Update session
-                coaching_session.add_frame(frame_data)
-                coaching_session.update_metrics(frame_data)
-                
-                # ========================================
-                # UPDATE POSE BUFFER (New Architecture)
-                # ========================================
-                pose_buffer.push(frame_data)
-                
-                # Convert keypoints from dict to tuple format for logger
-                keypoints_for_logger = []
-                for kp in frame_data.get("keypoints", []):
-                    if kp is not None:
-                        keypoints_for_logger.append((kp['x'], kp['y'], kp['confidence']))
-                    else:
-                        keypoints_for_logger.append(None)
-                
-                # Log comprehensive frame analysis
-                motion_logger.log_frame_analysis(
-                    frame_num=frame_count,
-                    points=keypoints_for_logger,
-                    points_names=POSE_NAMES,
-                    joints=frame_data.get("joints", {}),
-                    symmetry=frame_data.get("symmetry", {}),
-                    cog_data=frame_data.get("balance", {}),
-                    posture=frame_data.get("posture", {}),
-                    movement=frame_data.get("movement", {}),
-                    emotion=frame_data.get("emotion", {}),
-                    activities=frame_data.get("activities", [])
-                )
-                
-                # ========================================
-                # YOGA COACH SYSTEM (Deterministic)
-                # ========================================
-                import time
-                timestamp = time.time()
-                
-                # Update yoga coach with frame data
-                yoga_decision = yoga_coach.update(frame_data, timestamp)
-                
-                # Log yoga coach decision
-                if yoga_decision.get('should_coach'):
-                    motion_logger.log(f"\n[YOGA COACH] Frame {frame_count:04d}")
-                    motion_logger.log("-" * 80)
-                    motion_logger.log(f"  Asana: {yoga_decision['asana']}")
-                    motion_logger.log(f"  State: {yoga_decision['state']}")
-                    motion_logger.log(f"  Error: {yoga_decision['error_code']}")
-                    motion_logger.log(f"  Severity: {yoga_decision['severity']:.2f}")
-                    motion_logger.log(f"  Priority: {yoga_decision['priority']}")
-                    motion_logger.log(f"  Message: {yoga_decision['message']}")
-                    motion_logger.log("=" * 80)
-                    logger.info(f"🧘 Yoga Coach: {yoga_decision['message']}")
-                
-                # Get Gemini response for EVERY frame (or configure interval)
-                gemini_response = None
-                coaching_data = None
-                
-                # Check every 30 frames for Gemini response (~3 seconds at 10 FPS)
-                # This prevents blocking the real-time frame processing
-                if frame_count % 30 == 0:
-                    logger.info(f"🤖 Requesting Gemini analysis for frame {frame_count}")
-                    logger.debug(f"🔧 [MAIN] Preparing context for Gemini...")
-                    
-                    # Prepare keypoints as a dictionary for Gemini
-                    keypoints_dict = {POSE_NAMES[i]: kp for i, kp in enumerate(frame_data.get("keypoints", [])) if kp is not None}
-                    logger.debug(f"🔧 [MAIN] Keypoints dict created with {len(keypoints_dict)} points")
-                    logger.debug(f"🔧 [MAIN] Sample keypoint (Nose): {keypoints_dict.get('Nose', 'Not found')}")
-
-                    # Build context for Gemini with actual movement data
-                    context = {
-                        "posture": frame_data.get("posture", {}),
-                        "movement": frame_data.get("movement", {}),
-                        "emotion": frame_data.get("emotion", {}),
-                        "balance": frame_data.get("balance", {}),
-                        "symmetry": frame_data.get("symmetry", {}),
-                        "joints": frame_data.get("joints", {}),  # Added for specific joint feedback
-                        "keypoints": keypoints_dict,  # Added for position-based feedback
-                        "frame_num": frame_count
-                    }
-                    
-                    logger.debug(f"🔧 [MAIN] Context prepared:")
-                    logger.debug(f"  - Posture status: {context['posture'].get('status', 'Unknown')}")
-                    logger.debug(f"  - Movement energy: {context['movement'].get('energy', 'Unknown')}")
-                    logger.debug(f"  - Balance score: {context['balance'].get('balance_score', 0)}")
-                    logger.debug(f"  - Joints count: {len(context['joints'])}")
-                    logger.debug(f"  - Keypoints count: {len(context['keypoints'])}")
-                    
-                    try:
-                        logger.debug("🔧 [MAIN] Calling gemini_client.send_coaching_request...")
-                        # Get Gemini feedback
-                        feedback = await gemini_client.send_coaching_request(context)
-                        logger.debug(f"🔧 [MAIN] Gemini feedback received: {feedback}")
-                        
-                        gemini_response = {
-                            "feedback": feedback,
-                            "frame_num": frame_count,
-                            "triggered": True
-                        }
-                        
-                        # Log Gemini response
-                        motion_logger.log(f"\n[GEMINI AI COACH] Frame {frame_count:04d}")
-                        motion_logger.log("-" * 80)
-                        motion_logger.log(f"  Response: {feedback}")
-                        motion_logger.log("=" * 80)
-                        
-                        logger.info(f"🤖 Gemini: {feedback}")
-                        
-                        # Also include in coaching data for backward compatibility
-                        coaching_data = {
-                            "triggered": True,
-                            "reason": "ai_analysis",
-                            "feedback": feedback
-                        }
-                        
-                    except Exception as e:
-                        logger.error(f"❌ Gemini error: {e}")
-                        logger.error(f"❌ Error type: {type(e).__name__}")
-                        logger.error(f"❌ Context summary: posture={context.get('posture', {}).get('status')}, movement={context.get('movement', {}).get('energy')}")
-                        gemini_response = {
-                            "feedback": "Keep up the great work!",
-                            "frame_num": frame_count,
-                            "triggered": False,
-                            "error": str(e)
-                        }
-                
-                # Send analysis with yoga coach decision and optional Gemini
-                response_data = {
-                    "type": "analysis",
-                    "data": convert_to_serializable(frame_data)
-                }
-                
-                # Add YOGA COACH decision (primary coaching system)
-                response_data["yoga_coach"] = yoga_decision
+                if sender.closed:
+                    logger.warning(f"📴 Results can no longer reach {participant_id}, closing")
+                    break
                 
-                # Add Gemini response if available (optional polishing)
-                if gemini_response:
-                    response_data["gemini"] = gemini_response
-                
-                # Add coaching data for backward compatibility
-                if coaching_data:
-                    response_data["coaching"] = coaching_data
-                    logger.info(f"📤 Sending analysis WITH Gemini feedback")
-                elif yoga_decision.get('should_coach'):
-                    logger.info(f"📤 Sending analysis WITH Yoga Coach feedback")
-                else:
-                    logger.debug(f"📤 Sending analysis without feedback")
+                frame_count += 1
+                logger.info("🎬 Received frame %d from %s", frame_count, participant_id)
                 
-                await websocket.send_json(response_data)
-            
-            elif msg_type == "ping":
-                logger.debug("🏓 Ping received, sending pong")
-                await websocket.send_json({"type": "pong"})
+                # Decode, OpenPose and analysis run in the pipeline; results
+                # come back through forward_results()
+                pipeline.submit(frame_payload, frame_count)
             
             elif msg_type == "end":
                 logger.info(f"🛑 End signal received from {participant_id}")
@@ -747,6 +1017,12 @@ async def meet_websocket_endpoint(websocket: WebSocket, session_id: str):
     except Exception as e:
         logger.error(f"❌ Error in meeting {session_id}: {e}", exc_info=True)
     finally:
+        # Stop frame processing and any in-flight Gemini request before
+        # tearing down what they write to
+        await cancel_tasks(results_task, gemini_task)
+        await sender.close()
+        await pipeline.close()
+        
         # Close logger
         if participant_id in session_loggers:
             session_loggers[participant_id].close()
@@ -772,78 +1048,111 @@ async def video_analysis_endpoint(websocket: WebSocket):
     await websocket.accept()
     
     # Create unique session ID
-    session_id = hash(f"direct_{uuid.uuid4().hex[:8]}")
+    session_id = f"direct_{uuid.uuid4().hex[:8]}"
     logger.info(f"📹 Direct connection: session {session_id}")
     
     session = session_manager.create_session(session_id)
     coach = CoachEngine(session, gemini_client)
     
-    frame_count = 0
+    # Gemini requests run on the coach's feedback worker; a reply rides on
+    # the next analysis message
+    coaching_ready: Optional[Dict[str, Any]] = None
     
-    try:
-        await websocket.send_json({
-            "type": "connected",
-            "message": "Video analysis ready with OpenPose",
-            "session_id": session_id
-        })
-        
+    async def deliver_feedback(frame_data: Dict[str, Any], reason: str, feedback: str):
+        nonlocal coaching_ready
+        coaching_ready = {
+            "triggered": True,
+            "reason": reason,
+            "feedback": feedback
+        }
+    
+    async def forward_results():
+        """Coach and send analyzed frames from the pipeline"""
+        nonlocal coaching_ready
         while True:
-            try:
-                data = await websocket.receive_text()
-                message = json.loads(data)
-            except json.JSONDecodeError:
+            frame_count, frame_data, error = await pipeline.get_result()
+            
+            if error == "decode":
+                logger.error(f"❌ Failed to decode frame {frame_count}")
                 await websocket.send_json({
                     "type": "error",
-                    "message": "Invalid JSON"
+                    "message": "Failed to decode frame"
                 })
                 continue
             
-            msg_type = message.get("type", "frame")
+            if frame_data is None:
+                logger.error(f"❌ Frame processing returned None for frame {frame_count}")
+                continue
             
-            if msg_type == "frame":
-                frame_base64 = message.get("frame")
-                if not frame_base64:
-                    continue
-                
-                frame_count += 1
-                
-                frame = decode_base64_frame(frame_base64)
-                if frame is None:
-                    continue
-                
-                # Process with OpenPose
-                frame_data = await process_frame(frame, frame_count)
-                if frame_data is None:
-                    continue
-                
+            try:
                 session.add_frame(frame_data)
                 session.update_metrics(frame_data)
                 
-                # Check for coaching
-                coaching_data = None
+                # The coaching decision is a cheap synchronous check; the Gemini
+                # request is queued for the coach's worker (dropped when its
+                # queue is full)
                 if frame_count % 3 == 0:
-                    should_coach, reason = await coach.should_provide_feedback(frame_data)
-                    
+                    should_coach, reason = coach.should_provide_feedback(frame_data)
                     if should_coach:
-                        feedback = await coach.provide_feedback(frame_data, reason)
-                        coaching_data = {
-                            "triggered": True,
-                            "reason": reason,
-                            "feedback": feedback
-                        }
+                        coach.queue_feedback(frame_data, reason)
+                
+                coaching_data, coaching_ready = coaching_ready, None
                 
                 response_data = {
                     "type": "analysis",
-                    "data": convert_to_serializable(frame_data)
+                    "data": frame_data,
+                    "dropped_frames": pipeline.frames_dropped
                 }
                 
                 if coaching_data:
                     response_data["coaching"] = coaching_data
                 
-                await websocket.send_json(response_data)
+                sender.update(response_data)
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Error handling frame {frame_count}: {e}", exc_info=True)
+    
+    pipeline = create_frame_pipeline()
+    sender = create_result_sender(websocket)
+    results_task = None
+    frame_count = 0
+    
+    try:
+        await websocket.send_json({
+            "type": "connected",
+            "message": "Video analysis ready with OpenPose",
+            "session_id": session_id
+        })
+        
+        pipeline.start()
+        sender.start()
+        coach.start(deliver_feedback)
+        results_task = asyncio.create_task(forward_results())
+        
+        while True:
+            try:
+                message = await receive_message(websocket)
+            except ValueError:
+                await websocket.send_json({
+                    "type": "error",
+                    "message": "Invalid message"
+                })
+                continue
             
-            elif msg_type == "ping":
-                await websocket.send_json({"type": "pong"})
+            msg_type = message.get("type", "frame")
+            
+            if msg_type == "frame":
+                frame_payload = message.get("frame")
+                if not frame_payload:
+                    continue
+                
+                if sender.closed:
+                    logger.warning(f"📴 Results can no longer reach session {session_id}, closing")
+                    break
+                
+                frame_count += 1
+                pipeline.submit(frame_payload, frame_count)
             
             elif msg_type == "end":
                 break
@@ -853,6 +1162,10 @@ async def video_analysis_endpoint(websocket: WebSocket):
     except Exception as e:
         logger.error(f"Error in session {session_id}: {e}", exc_info=True)
     finally:
+        await cancel_tasks(results_task)
+        await coach.close()
+        await sender.close()
+        await pipeline.close()
         session_manager.remove_session(session_id)
 
 
@@ -864,7 +1177,7 @@ async def health_check():
         "pose_detector": pose_detector is not None,
         "gemini": gemini_client.is_connected() if gemini_client else False,
         "active_sessions": session_manager.get_session_count(),
-        "active_meetings": len(video_meet_manager.get_all_sessions()) if video_meet_manager else 0,
+        "active_meetings": video_meet_manager.get_session_count() if video_meet_manager else 0,
         "openpose": "loaded"
     }
 
@@ -872,11 +1185,12 @@ async def health_check():
 @app.get("/stats")
 async def get_stats():
     """System statistics"""
+    meetings = video_meet_manager.get_all_sessions() if video_meet_manager else {}
     return {
         "active_sessions": session_manager.get_session_count(),
-        "active_meetings": len(video_meet_manager.get_all_sessions()) if video_meet_manager else 0,
+        "active_meetings": len(meetings),
         "session_details": session_manager.get_all_stats(),
-        "meetings": video_meet_manager.get_all_sessions() if video_meet_manager else {},
+        "meetings": meetings,
         "services": {
             "pose_detection": "OpenPose COCO",
             "gemini_ai": gemini_client.is_connected() if gemini_client else False,
@@ -891,11 +1205,17 @@ def main():
     logger.info("AI Video Coach Backend with OpenPose")
     logger.info("=" * 60)
     
+    # Meetings and sessions live in process memory, so more than one worker
+    # needs sticky routing (a meeting's HTTP and WebSocket traffic on the
+    # same worker) at the load balancer
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=9005,
         reload=False,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        loop="uvloop",
+        http="httptools",
         log_level="info",
         ws_ping_interval=30,  # Send ping every 30 seconds
         ws_ping_timeout=60,   # Wait 60 seconds for pong (increased for long Gemini calls)
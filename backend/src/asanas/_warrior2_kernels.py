@@ -0,0 +1,99 @@
+"""
+Warrior II Alignment Kernels
+Compiled per-rule checks on keypoint coordinates, and a frame loop running all five.
+The level, stacking and spine tests are asana_base's shared scalar checks.
+"""
+
+import math
+
+import numpy as np
+
+from src.core.jit import njit, HAS_NUMBA
+from src.services.asana_base import (offset_check, spine_vertical as _spine_vertical, NECK, R_SHOULDER, R_WRIST,
+                                     L_SHOULDER, L_WRIST, R_HIP, R_KNEE, R_ANKLE, L_HIP)
+
+
+# Angle thresholds as tangents: arms within 15° of horizontal, spine
+# within 15° of vertical, compared without trig
+ARM_TAN_THRESHOLD = math.tan(math.radians(15))
+SPINE_TAN_THRESHOLD = math.tan(math.radians(15))
+
+RAD2DEG = 180.0 / math.pi
+
+
+@njit(cache=True, fastmath=True)
+def knee_over_ankle(knee_x, knee_y, ankle_x, ankle_y):
+    """Front knee within 20% of the shin's height of the ankle, horizontally"""
+    return offset_check(math.fabs(knee_x - ankle_x), math.fabs(knee_y - ankle_y), 0.2, 0.5)
+
+
+@njit(cache=True, fastmath=True)
+def arms_parallel(r_dx, r_dy, l_dx, l_dy):
+    """Both shoulder -> wrist lines within 15° of horizontal (severity over 45°)"""
+    r_rise, r_run = math.fabs(r_dy), math.fabs(r_dx)
+    l_rise, l_run = math.fabs(l_dy), math.fabs(l_dx)
+    if r_rise > ARM_TAN_THRESHOLD * r_run or l_rise > ARM_TAN_THRESHOLD * l_run:
+        # Steeper arm's deviation from horizontal, 0-90°
+        angle = max(math.atan2(r_rise, r_run), math.atan2(l_rise, l_run)) * RAD2DEG
+        return False, min(angle / 45, 1.0)
+    return True, 0.0
+
+
+@njit(cache=True, fastmath=True)
+def hips_square(r_hip_x, r_hip_y, l_hip_x, l_hip_y):
+    """Hip height difference under 10% of hip width"""
+    return offset_check(math.fabs(r_hip_y - l_hip_y), math.fabs(r_hip_x - l_hip_x), 0.1, 0.3)
+
+
+@njit(cache=True, fastmath=True)
+def spine_vertical(neck_x, neck_y, mid_hip_x, mid_hip_y):
+    """Neck -> mid-hip line within 15° of vertical (severity over 45°)"""
+    return _spine_vertical(neck_x - mid_hip_x, mid_hip_y - neck_y, SPINE_TAN_THRESHOLD, 45.0)
+
+
+@njit(cache=True, fastmath=True)
+def shoulders_over_hips(mid_shoulder_x, mid_shoulder_y, mid_hip_x, mid_hip_y):
+    """Mid-shoulder within 15% of torso height of the mid-hip, horizontally"""
+    return offset_check(math.fabs(mid_shoulder_x - mid_hip_x), math.fabs(mid_shoulder_y - mid_hip_y), 0.15, 0.4)
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def warrior2_scores(kp, valid):
+    """
+    All five rules for each frame, in WarriorII.alignment_rules order
+    
+    Args:
+        kp: (N, 18, 3) keypoint array
+        valid: (N, 5) mask of rules whose joints are present (fastmath
+            assumes no NaN, so missing joints must never be read)
+    
+    Returns:
+        (is_aligned, severity) arrays shaped (N, 5)
+    """
+    n = kp.shape[0]
+    aligned = np.ones((n, 5), dtype=np.bool_)
+    severity = np.zeros((n, 5))
+    for i in range(n):
+        p = kp[i]
+        if valid[i, 0]:
+            aligned[i, 0], severity[i, 0] = knee_over_ankle(p[R_KNEE, 0], p[R_KNEE, 1], p[R_ANKLE, 0], p[R_ANKLE, 1])
+        if valid[i, 1]:
+            aligned[i, 1], severity[i, 1] = arms_parallel(p[R_WRIST, 0] - p[R_SHOULDER, 0], p[R_WRIST, 1] - p[R_SHOULDER, 1],
+                                                          p[L_WRIST, 0] - p[L_SHOULDER, 0], p[L_WRIST, 1] - p[L_SHOULDER, 1])
+        if valid[i, 2]:
+            aligned[i, 2], severity[i, 2] = hips_square(p[R_HIP, 0], p[R_HIP, 1], p[L_HIP, 0], p[L_HIP, 1])
+        if valid[i, 3] or valid[i, 4]:
+            mid_hip_x = 0.5 * (p[R_HIP, 0] + p[L_HIP, 0])
+            mid_hip_y = 0.5 * (p[R_HIP, 1] + p[L_HIP, 1])
+            if valid[i, 3]:
+                aligned[i, 3], severity[i, 3] = spine_vertical(p[NECK, 0], p[NECK, 1], mid_hip_x, mid_hip_y)
+            if valid[i, 4]:
+                aligned[i, 4], severity[i, 4] = shoulders_over_hips(0.5 * (p[R_SHOULDER, 0] + p[L_SHOULDER, 0]),
+                                                                    0.5 * (p[R_SHOULDER, 1] + p[L_SHOULDER, 1]),
+                                                                    mid_hip_x, mid_hip_y)
+    return aligned, severity
+
+
+# Compile the kernels at import so the first frame doesn't pay the JIT cost
+if HAS_NUMBA:
+    warrior2_scores(np.zeros((1, 18, 3), dtype=np.float32), np.ones((1, 5), dtype=np.bool_))
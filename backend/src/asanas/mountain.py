@@ -10,8 +10,11 @@ Biomechanical Specification:
 - Shoulders relaxed
 """
 
-from typing import Dict, Tuple
-from src.services.asana_base import AsanaBase, JointAngleConstraint, AlignmentRule, JointPriority
+import math
+from typing import Tuple
+from src.services.asana_base import (AsanaBase, JointAngleConstraint, AlignmentRule, JointPriority,
+                                     joint_mask, run_check_kernel, spine_vertical_scores, level_scores,
+                                     NECK, R_SHOULDER, L_SHOULDER, R_HIP, L_HIP, R_ANKLE, L_ANKLE)
 import numpy as np
 
 
@@ -26,6 +29,14 @@ class MountainPose(AsanaBase):
     4. Shoulders relaxed (MEDIUM - upper body alignment)
     """
     
+    # Keypoints each alignment check needs, as presence bitmasks
+    SPINE_JOINTS = joint_mask(NECK, R_HIP, L_HIP)
+    WEIGHT_JOINTS = joint_mask(R_ANKLE, L_ANKLE, R_HIP, L_HIP)
+    SHOULDER_JOINTS = joint_mask(R_SHOULDER, L_SHOULDER)
+    
+    # Spine lean threshold (10°) as a tangent, for the trig-free comparison
+    SPINE_TAN_THRESHOLD = math.tan(math.radians(10))
+    
     def __init__(self):
         super().__init__()
         
@@ -112,73 +123,20 @@ class MountainPose(AsanaBase):
             'shoulders_level': 'Level your shoulders and draw them away from your ears'
         }
     
-    def check_spine_vertical(self, keypoints: Dict[str, Tuple[float, float, float]]) -> Tuple[bool, float]:
-        """Check if spine is vertical"""
-        if 'Neck' not in keypoints or 'RHip' not in keypoints or 'LHip' not in keypoints:
-            return True, 0.0
-        
-        neck = keypoints['Neck']
-        r_hip = keypoints['RHip']
-        l_hip = keypoints['LHip']
-        
-        mid_hip = ((r_hip[0] + l_hip[0]) / 2, (r_hip[1] + l_hip[1]) / 2)
-        spine_vector = (neck[0] - mid_hip[0], neck[1] - mid_hip[1])
-        
-        angle = abs(np.degrees(np.arctan2(spine_vector[0], -spine_vector[1])))
-        threshold = 10  # Stricter for Mountain Pose
-        
-        if angle > threshold:
-            severity = min(angle / 30, 1.0)
-            return False, severity
-        
-        return True, 0.0
+    def check_spine_vertical(self, kp: np.ndarray, present: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Check if spine is vertical (within 10°, stricter for Mountain Pose)"""
+        valid = (present & self.SPINE_JOINTS) == self.SPINE_JOINTS
+        return run_check_kernel(spine_vertical_scores, kp, valid, self.SPINE_TAN_THRESHOLD, 30.0)
     
-    def check_weight_balanced(self, keypoints: Dict[str, Tuple[float, float, float]]) -> Tuple[bool, float]:
-        """Check if weight is balanced between feet"""
-        if 'RAnkle' not in keypoints or 'LAnkle' not in keypoints:
-            return True, 0.0
-        
-        if 'RHip' not in keypoints or 'LHip' not in keypoints:
-            return True, 0.0
-        
-        r_ankle = keypoints['RAnkle']
-        l_ankle = keypoints['LAnkle']
-        r_hip = keypoints['RHip']
-        l_hip = keypoints['LHip']
-        
-        # Check if hips are level (indicator of weight distribution)
-        hip_height_diff = abs(r_hip[1] - l_hip[1])
-        hip_width = abs(r_hip[0] - l_hip[0])
-        
-        if hip_width < 10:
-            return True, 0.0
-        
-        threshold = hip_width * 0.05  # Very strict for Mountain Pose
-        
-        if hip_height_diff > threshold:
-            severity = min(hip_height_diff / (hip_width * 0.15), 1.0)
-            return False, severity
-        
-        return True, 0.0
+    def check_weight_balanced(self, kp: np.ndarray, present: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Check if weight is balanced between feet
+        (Level hips indicate even weight distribution; very strict 5% for Mountain Pose)
+        """
+        valid = (present & self.WEIGHT_JOINTS) == self.WEIGHT_JOINTS
+        return run_check_kernel(level_scores, kp, valid, R_HIP, L_HIP, 0.05, 0.15)
     
-    def check_shoulders_level(self, keypoints: Dict[str, Tuple[float, float, float]]) -> Tuple[bool, float]:
+    def check_shoulders_level(self, kp: np.ndarray, present: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """Check if shoulders are level"""
-        if 'RShoulder' not in keypoints or 'LShoulder' not in keypoints:
-            return True, 0.0
-        
-        r_shoulder = keypoints['RShoulder']
-        l_shoulder = keypoints['LShoulder']
-        
-        height_diff = abs(r_shoulder[1] - l_shoulder[1])
-        shoulder_width = abs(r_shoulder[0] - l_shoulder[0])
-        
-        if shoulder_width < 10:
-            return True, 0.0
-        
-        threshold = shoulder_width * 0.08
-        
-        if height_diff > threshold:
-            severity = min(height_diff / (shoulder_width * 0.2), 1.0)
-            return False, severity
-        
-        return True, 0.0
+        valid = (present & self.SHOULDER_JOINTS) == self.SHOULDER_JOINTS
+        return run_check_kernel(level_scores, kp, valid, R_SHOULDER, L_SHOULDER, 0.08, 0.2)
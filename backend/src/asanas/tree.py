@@ -10,8 +10,11 @@ Biomechanical Specification:
 - Balance and focus
 """
 
-from typing import Dict, Tuple
-from src.services.asana_base import AsanaBase, JointAngleConstraint, AlignmentRule, JointPriority
+import math
+from typing import Tuple
+from src.services.asana_base import (AsanaBase, JointAngleConstraint, AlignmentRule, JointPriority,
+                                     joint_mask, run_check_kernel, spine_vertical_scores, level_scores,
+                                     stacked_scores, NECK, R_HIP, L_HIP, R_KNEE, L_KNEE, R_ANKLE, L_ANKLE)
 import numpy as np
 
 
@@ -26,6 +29,13 @@ class TreePose(AsanaBase):
     4. Lifted knee open to side (MEDIUM - hip opening)
     """
     
+    # Keypoints each alignment check needs, as presence bitmasks
+    HIP_JOINTS = joint_mask(R_HIP, L_HIP)
+    SPINE_JOINTS = joint_mask(NECK, R_HIP, L_HIP)
+    
+    # Spine lean threshold (12°) as a tangent, for the trig-free comparison
+    SPINE_TAN_THRESHOLD = math.tan(math.radians(12))
+    
     def __init__(self, standing_leg='right'):
         """
         Args:
@@ -49,6 +59,11 @@ class TreePose(AsanaBase):
             self.lifted_knee = 'right_knee'
             self.lifted_hip = 'right_hip'
         
+        # Standing-leg keypoints for the per-frame foot check
+        self._standing_ankle_idx = R_ANKLE if standing_leg == 'right' else L_ANKLE
+        self._standing_knee_idx = R_KNEE if standing_leg == 'right' else L_KNEE
+        self._standing_foot_joints = joint_mask(self._standing_ankle_idx, self._standing_knee_idx)
+        
         self.required_joints = [
             self.standing_knee,
             self.standing_hip,
@@ -132,75 +147,21 @@ class TreePose(AsanaBase):
             'standing_foot_grounded': 'Root down through all four corners of your standing foot'
         }
     
-    def check_hips_level(self, keypoints: Dict[str, Tuple[float, float, float]]) -> Tuple[bool, float]:
-        """Check if hips are level (critical for balance)"""
-        if 'RHip' not in keypoints or 'LHip' not in keypoints:
-            return True, 0.0
-        
-        r_hip = keypoints['RHip']
-        l_hip = keypoints['LHip']
-        
-        height_diff = abs(r_hip[1] - l_hip[1])
-        hip_width = abs(r_hip[0] - l_hip[0])
-        
-        if hip_width < 10:
-            return True, 0.0
-        
-        # Stricter threshold for Tree Pose
-        threshold = hip_width * 0.08
-        
-        if height_diff > threshold:
-            severity = min(height_diff / (hip_width * 0.2), 1.0)
-            return False, severity
-        
-        return True, 0.0
+    def check_hips_level(self, kp: np.ndarray, present: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Check if hips are level (critical for balance; stricter 8% for Tree Pose)"""
+        valid = (present & self.HIP_JOINTS) == self.HIP_JOINTS
+        return run_check_kernel(level_scores, kp, valid, R_HIP, L_HIP, 0.08, 0.2)
     
-    def check_spine_vertical(self, keypoints: Dict[str, Tuple[float, float, float]]) -> Tuple[bool, float]:
-        """Check if spine is vertical"""
-        if 'Neck' not in keypoints or 'RHip' not in keypoints or 'LHip' not in keypoints:
-            return True, 0.0
-        
-        neck = keypoints['Neck']
-        r_hip = keypoints['RHip']
-        l_hip = keypoints['LHip']
-        
-        mid_hip = ((r_hip[0] + l_hip[0]) / 2, (r_hip[1] + l_hip[1]) / 2)
-        spine_vector = (neck[0] - mid_hip[0], neck[1] - mid_hip[1])
-        
-        angle = abs(np.degrees(np.arctan2(spine_vector[0], -spine_vector[1])))
-        threshold = 12
-        
-        if angle > threshold:
-            severity = min(angle / 35, 1.0)
-            return False, severity
-        
-        return True, 0.0
+    def check_spine_vertical(self, kp: np.ndarray, present: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Check if spine is vertical (within 12°)"""
+        valid = (present & self.SPINE_JOINTS) == self.SPINE_JOINTS
+        return run_check_kernel(spine_vertical_scores, kp, valid, self.SPINE_TAN_THRESHOLD, 35.0)
     
-    def check_standing_foot(self, keypoints: Dict[str, Tuple[float, float, float]]) -> Tuple[bool, float]:
+    def check_standing_foot(self, kp: np.ndarray, present: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
         Check if standing foot is grounded
-        (In 2D, we check if ankle is stable relative to knee)
+        (In 2D, we check if ankle is stable relative to knee: roughly below it)
         """
-        standing_ankle = 'RAnkle' if self.standing_leg == 'right' else 'LAnkle'
-        standing_knee_kp = 'RKnee' if self.standing_leg == 'right' else 'LKnee'
-        
-        if standing_ankle not in keypoints or standing_knee_kp not in keypoints:
-            return True, 0.0
-        
-        ankle = keypoints[standing_ankle]
-        knee = keypoints[standing_knee_kp]
-        
-        # Ankle should be roughly below knee (vertical alignment)
-        horizontal_offset = abs(ankle[0] - knee[0])
-        vertical_distance = abs(ankle[1] - knee[1])
-        
-        if vertical_distance < 10:
-            return True, 0.0
-        
-        threshold = vertical_distance * 0.15
-        
-        if horizontal_offset > threshold:
-            severity = min(horizontal_offset / (vertical_distance * 0.3), 1.0)
-            return False, severity
-        
-        return True, 0.0
+        required = self._standing_foot_joints
+        valid = (present & required) == required
+        return run_check_kernel(stacked_scores, kp, valid, self._standing_ankle_idx, self._standing_knee_idx, 0.15, 0.3)
@@ -3,23 +3,69 @@ Asana Definitions Database
 Contains ideal alignments, detection rules, and common mistakes for yoga asanas
 """
 
+from functools import lru_cache
 from typing import Dict, List, Any
 
+import numpy as np
+
+
+# Detection rules are data: each is (name, feature, op, threshold), tested
+# as `features[feature] > threshold` (OP_GT) or `< threshold` (OP_LT) on
+# one vector of frame features (see AsanaDetector.detection_features), so
+# every asana's rules are evaluated in a single array comparison.
+#
+# "Either knee over X" is the larger knee angle over X, "both knees over
+# X" the smaller one, and so on.
+F_KNEE_MAX = 0          # larger of RKnee / LKnee angle
+F_KNEE_MIN = 1          # smaller of RKnee / LKnee angle
+F_SHOULDER_MAX = 2      # larger of RShoulder / LShoulder angle
+F_ELBOW_MIN = 3         # smaller of RElbow / LElbow angle
+F_HIP_TILT = 4          # |RHip.y - LHip.y|
+F_ANKLE_SPREAD = 5      # |RAnkle.x - LAnkle.x|
+F_HIP_BELOW_NECK = 6    # RHip.y - Neck.y (image y grows downward)
+F_BALANCE = 7           # balance score
+F_POSTURE_ANGLE = 8     # posture angle
+F_ALWAYS = 9            # constant 1.0, for rules that always pass
+NUM_FEATURES = 10
+
+OP_GT, OP_LT = 0, 1
+
+RULE_DTYPE = np.dtype([('name', 'U24'), ('feature', np.int8), ('op', np.int8), ('threshold', np.float32)])
+
+
+def _rules(*rules) -> np.ndarray:
+    """Detection rule table from (name, feature, op, threshold) tuples"""
+    return np.array(list(rules), dtype=RULE_DTYPE)
+
+
+def evaluate_rules(rules: np.ndarray, features: np.ndarray) -> np.ndarray:
+    """
+    Evaluate a detection rule table against a frame's feature vector
+    
+    Args:
+        rules: RULE_DTYPE array (one asana's, or DETECTION_TABLE)
+        features: Vector of NUM_FEATURES values
+        
+    Returns:
+        Bool mask of rules passed; NaN features fail every rule
+    """
+    values = features[rules['feature']]
+    return np.where(rules['op'] == OP_GT, values > rules['threshold'], values < rules['threshold'])
+
+
 ASANA_DEFINITIONS: Dict[str, Dict[str, Any]] = {
     "tree_pose": {
         "name": "Tree Pose (Vrksasana)",
         "description": "A standing balance pose with one foot on the inner thigh",
         
-        "detection_rules": {
-            # One leg should be straight (standing leg)
-            "has_straight_leg": lambda joints: any(angle > 160 for angle in [joints.get('RKnee', 0), joints.get('LKnee', 0)]),
-            # One leg should be bent (raised leg)
-            "has_bent_leg": lambda joints: any(angle < 100 for angle in [joints.get('RKnee', 0), joints.get('LKnee', 0)]),
-            # Hips should be relatively level
-            "hips_level": lambda keypoints: abs(keypoints.get('RHip', {}).get('y', 0) - keypoints.get('LHip', {}).get('y', 0)) < 40,
-            # Balance score should be moderate to high
-            "balance_required": lambda balance: balance.get('balance_score', 0) > 35,
-        },
+        # One leg straight (standing leg), one bent (raised leg), hips
+        # relatively level, moderate to high balance
+        "detection_rules": _rules(
+            ("has_straight_leg", F_KNEE_MAX, OP_GT, 160),
+            ("has_bent_leg", F_KNEE_MIN, OP_LT, 100),
+            ("hips_level", F_HIP_TILT, OP_LT, 40),
+            ("balance_required", F_BALANCE, OP_GT, 35),
+        ),
         
         "ideal_alignment": [
             "Standing leg completely straight and engaged",
@@ -52,16 +98,14 @@ ASANA_DEFINITIONS: Dict[str, Dict[str, Any]] = {
         "name": "Mountain Pose (Tadasana)",
         "description": "A foundational standing pose with feet together and body aligned",
         
-        "detection_rules": {
-            # Both legs should be straight
-            "legs_straight": lambda joints: joints.get('RKnee', 0) > 160 and joints.get('LKnee', 0) > 160,
-            # Feet should be close together
-            "feet_together": lambda keypoints: abs(keypoints.get('RAnkle', {}).get('x', 0) - keypoints.get('LAnkle', {}).get('x', 0)) < 50,
-            # Upright posture
-            "upright": lambda posture: posture.get('angle', 0) > 80,
-            # Arms likely at sides or overhead
-            "arms_position": lambda joints: True,  # Flexible for arms
-        },
+        # Both legs straight, feet close together, upright posture; arms
+        # are flexible (at sides or overhead)
+        "detection_rules": _rules(
+            ("legs_straight", F_KNEE_MIN, OP_GT, 160),
+            ("feet_together", F_ANKLE_SPREAD, OP_LT, 50),
+            ("upright", F_POSTURE_ANGLE, OP_GT, 80),
+            ("arms_position", F_ALWAYS, OP_GT, 0),
+        ),
         
         "ideal_alignment": [
             "Feet together or hip-width apart, parallel",
@@ -95,16 +139,14 @@ ASANA_DEFINITIONS: Dict[str, Dict[str, Any]] = {
         "name": "Warrior 1 (Virabhadrasana I)",
         "description": "A standing lunge pose with front knee bent and arms overhead",
         
-        "detection_rules": {
-            # One knee bent (front leg)
-            "front_knee_bent": lambda joints: any(angle < 130 for angle in [joints.get('RKnee', 0), joints.get('LKnee', 0)]),
-            # One leg straight (back leg)
-            "back_leg_straight": lambda joints: any(angle > 150 for angle in [joints.get('RKnee', 0), joints.get('LKnee', 0)]),
-            # Arms likely overhead
-            "arms_raised": lambda joints: any(angle > 140 for angle in [joints.get('RShoulder', 0), joints.get('LShoulder', 0)]),
-            # Wide stance
-            "wide_stance": lambda keypoints: abs(keypoints.get('RAnkle', {}).get('x', 0) - keypoints.get('LAnkle', {}).get('x', 0)) > 100,
-        },
+        # One knee bent (front leg), one leg straight (back leg), arms
+        # likely overhead, wide stance
+        "detection_rules": _rules(
+            ("front_knee_bent", F_KNEE_MIN, OP_LT, 130),
+            ("back_leg_straight", F_KNEE_MAX, OP_GT, 150),
+            ("arms_raised", F_SHOULDER_MAX, OP_GT, 140),
+            ("wide_stance", F_ANKLE_SPREAD, OP_GT, 100),
+        ),
         
         "ideal_alignment": [
             "Front knee bent to 90 degrees, aligned over ankle",
@@ -137,16 +179,14 @@ ASANA_DEFINITIONS: Dict[str, Dict[str, Any]] = {
         "name": "Warrior 2 (Virabhadrasana II)",
         "description": "A standing lunge pose with arms extended to the sides",
         
-        "detection_rules": {
-            # One knee bent
-            "front_knee_bent": lambda joints: any(angle < 130 for angle in [joints.get('RKnee', 0), joints.get('LKnee', 0)]),
-            # One leg straight
-            "back_leg_straight": lambda joints: any(angle > 150 for angle in [joints.get('RKnee', 0), joints.get('LKnee', 0)]),
-            # Arms extended to sides (not overhead like W1)
-            "arms_extended": lambda joints: joints.get('RElbow', 0) > 140 and joints.get('LElbow', 0) > 140,
-            # Wide stance
-            "wide_stance": lambda keypoints: abs(keypoints.get('RAnkle', {}).get('x', 0) - keypoints.get('LAnkle', {}).get('x', 0)) > 100,
-        },
+        # One knee bent, one leg straight, arms extended to the sides (not
+        # overhead like W1), wide stance
+        "detection_rules": _rules(
+            ("front_knee_bent", F_KNEE_MIN, OP_LT, 130),
+            ("back_leg_straight", F_KNEE_MAX, OP_GT, 150),
+            ("arms_extended", F_ELBOW_MIN, OP_GT, 140),
+            ("wide_stance", F_ANKLE_SPREAD, OP_GT, 100),
+        ),
         
         "ideal_alignment": [
             "Front knee bent to 90 degrees, aligned over ankle",
@@ -179,16 +219,14 @@ ASANA_DEFINITIONS: Dict[str, Dict[str, Any]] = {
         "name": "Downward-Facing Dog (Adho Mukha Svanasana)",
         "description": "An inverted V-shape pose with hands and feet on the ground",
         
-        "detection_rules": {
-            # Both knees should be relatively straight
-            "legs_straight": lambda joints: joints.get('RKnee', 0) > 140 and joints.get('LKnee', 0) > 140,
-            # Both elbows should be straight
-            "arms_straight": lambda joints: joints.get('RElbow', 0) > 150 and joints.get('LElbow', 0) > 150,
-            # Hips should be highest point (inverted V)
-            "hips_elevated": lambda keypoints: keypoints.get('RHip', {}).get('y', 500) < keypoints.get('Neck', {}).get('y', 0),
-            # Body in inverted position
-            "inverted": lambda posture: posture.get('angle', 90) < 60,
-        },
+        # Both knees relatively straight, both elbows straight, hips the
+        # highest point (inverted V), body inverted
+        "detection_rules": _rules(
+            ("legs_straight", F_KNEE_MIN, OP_GT, 140),
+            ("arms_straight", F_ELBOW_MIN, OP_GT, 150),
+            ("hips_elevated", F_HIP_BELOW_NECK, OP_LT, 0),
+            ("inverted", F_POSTURE_ANGLE, OP_LT, 60),
+        ),
         
         "ideal_alignment": [
             "Hands shoulder-width apart, fingers spread wide",
@@ -219,30 +257,48 @@ ASANA_DEFINITIONS: Dict[str, Dict[str, Any]] = {
 }
 
 
+# Every asana's rules in one table, for detecting all asanas in one pass:
+# DETECTION_TABLE[DETECTION_OFFSETS[i]:][:DETECTION_COUNTS[i]] are the rules of
+# DETECTION_ASANAS[i]
+DETECTION_ASANAS = [name for name, asana in ASANA_DEFINITIONS.items() if len(asana['detection_rules'])]
+DETECTION_TABLE = np.concatenate([ASANA_DEFINITIONS[name]['detection_rules'] for name in DETECTION_ASANAS])
+DETECTION_COUNTS = np.array([len(ASANA_DEFINITIONS[name]['detection_rules']) for name in DETECTION_ASANAS])
+DETECTION_OFFSETS = np.concatenate(([0], np.cumsum(DETECTION_COUNTS)[:-1]))
+
+# Prompt text is static, so format each asana's bullet lists once here
+for _asana in ASANA_DEFINITIONS.values():
+    _asana['_ideal_alignment_str'] = "\n".join(f"- {alignment}" for alignment in _asana.get('ideal_alignment', []))
+    _asana['_common_mistakes_str'] = "\n".join(f"- {mistake}" for mistake in _asana.get('common_mistakes', []))
+del _asana
+
+
+# The definitions never change at runtime, so the getters are cached;
+# callers must not mutate what they return
+@lru_cache(maxsize=1)
 def get_asana_names() -> List[str]:
     """Get list of all supported asana names"""
     return list(ASANA_DEFINITIONS.keys())
 
 
+@lru_cache(maxsize=16)
 def get_asana_info(asana_name: str) -> Dict[str, Any]:
     """Get full information for a specific asana"""
     return ASANA_DEFINITIONS.get(asana_name, {})
 
 
+@lru_cache(maxsize=16)
 def get_ideal_alignment(asana_name: str) -> str:
     """Get ideal alignment description for an asana"""
-    asana = ASANA_DEFINITIONS.get(asana_name, {})
-    alignments = asana.get('ideal_alignment', [])
-    return "\n".join(f"- {alignment}" for alignment in alignments)
+    return ASANA_DEFINITIONS.get(asana_name, {}).get('_ideal_alignment_str', '')
 
 
+@lru_cache(maxsize=16)
 def get_common_mistakes(asana_name: str) -> str:
     """Get common mistakes for an asana"""
-    asana = ASANA_DEFINITIONS.get(asana_name, {})
-    mistakes = asana.get('common_mistakes', [])
-    return "\n".join(f"- {mistake}" for mistake in mistakes)
+    return ASANA_DEFINITIONS.get(asana_name, {}).get('_common_mistakes_str', '')
 
 
+@lru_cache(maxsize=16)
 def get_key_corrections(asana_name: str) -> Dict[str, str]:
     """Get key corrections dictionary for an asana"""
     asana = ASANA_DEFINITIONS.get(asana_name, {})
@@ -3,8 +3,108 @@ Body Science Module
 Advanced body biomechanics and analysis calculations
 """
 
+import math
+
 import numpy as np
 
+from src.core.jit import njit, HAS_NUMBA
+
+# Keypoint index triples (p1, p2, p3) for the angle at p2
+_JOINT_NAMES = ('right_elbow', 'left_elbow', 'right_knee', 'left_knee', 'right_hip', 'left_hip')
+_JOINT_TRIPLES = np.array([
+    [2, 3, 4],     # RShoulder-RElbow-RWrist
+    [5, 6, 7],     # LShoulder-LElbow-LWrist
+    [8, 9, 10],    # RHip-RKnee-RAnkle
+    [11, 12, 13],  # LHip-LKnee-LAnkle
+    [2, 8, 9],     # RShoulder-RHip-RKnee
+    [5, 11, 12],   # LShoulder-LHip-LKnee
+])
+
+# Keypoint index pairs for the segments used by the symmetry analysis
+_SYMMETRY_PAIRS = np.array([
+    [2, 5],    # RShoulder-LShoulder (shoulder width)
+    [8, 11],   # RHip-LHip (hip width)
+    [2, 4],    # RShoulder-RWrist (right arm)
+    [5, 7],    # LShoulder-LWrist (left arm)
+    [8, 10],   # RHip-RAnkle (right leg)
+    [11, 13],  # LHip-LAnkle (left leg)
+])
+_SYMMETRY_NAMES = ('shoulder_width', 'hip_width', 'arm_symmetry', 'leg_symmetry')
+
+
+def _coords(P):
+    """x/y columns of a packed keypoint array, widened to float64 for the math"""
+    return P[:, :2].astype(np.float64)
+
+
+@njit(cache=True, fastmath=True)
+def _compute(packed, valid):
+    """
+    Compiled per-frame body science kernel
+    
+    Args:
+        packed: (18, 3) keypoint array as returned by PoseDetector.detect
+        valid: (18,) bool mask of detected keypoints (computed by the caller:
+            fastmath lets the compiler assume values are never NaN)
+        
+    Returns:
+        (angles[6], symmetry[4], cog[2], balance_score); NaN marks values that
+        could not be computed
+    """
+    # Widen x/y to float64 for the math
+    n = packed.shape[0]
+    P = np.empty((n, 2))
+    for i in range(n):
+        P[i, 0] = packed[i, 0]
+        P[i, 1] = packed[i, 1]
+    
+    angles = np.full(6, np.nan)
+    for k in range(6):
+        a, b, c = _JOINT_TRIPLES[k, 0], _JOINT_TRIPLES[k, 1], _JOINT_TRIPLES[k, 2]
+        if valid[a] and valid[b] and valid[c]:
+            bax, bay = P[a, 0] - P[b, 0], P[a, 1] - P[b, 1]
+            bcx, bcy = P[c, 0] - P[b, 0], P[c, 1] - P[b, 1]
+            cos_angle = (bax * bcx + bay * bcy) / (math.sqrt(bax * bax + bay * bay) *
+                                                   math.sqrt(bcx * bcx + bcy * bcy) + 1e-6)
+            angles[k] = math.degrees(math.acos(min(1.0, max(-1.0, cos_angle))))
+    
+    d = np.zeros(6)
+    for k in range(6):
+        i, j = _SYMMETRY_PAIRS[k, 0], _SYMMETRY_PAIRS[k, 1]
+        if valid[i] and valid[j]:
+            d[k] = math.hypot(P[i, 0] - P[j, 0], P[i, 1] - P[j, 1])
+    
+    symmetry = np.full(4, np.nan)
+    if valid[2] and valid[5]:
+        symmetry[0] = d[0]
+    if valid[8] and valid[11]:
+        symmetry[1] = d[1]
+    if d[2] > 0 and d[3] > 0:
+        symmetry[2] = abs(d[2] - d[3]) / max(d[2], d[3]) * 100
+    if d[4] > 0 and d[5] > 0:
+        symmetry[3] = abs(d[4] - d[5]) / max(d[4], d[5]) * 100
+    
+    cog = np.full(2, np.nan)
+    balance = np.nan
+    n = 0
+    sx = 0.0
+    sy = 0.0
+    for i in range(P.shape[0]):
+        if valid[i]:
+            sx += P[i, 0]
+            sy += P[i, 1]
+            n += 1
+    if n > 0:
+        cog[0] = sx / n
+        cog[1] = sy / n
+        balance = 50.0
+        if valid[8] and valid[11] and valid[10] and valid[13]:
+            base_width = abs(P[10, 0] - P[13, 0])
+            score = 100 - (abs(cog[0] - (P[10, 0] + P[13, 0]) / 2) / max(base_width, 1.0) * 100)
+            balance = min(100.0, max(0.0, score))
+    
+    return angles, symmetry, cog, balance
+
 
 class BodyScience:
     """Calculate advanced body science metrics"""
@@ -31,73 +131,98 @@ class BodyScience:
         """Calculate Euclidean distance between two points"""
         if not p1 or not p2:
             return None
-        return np.linalg.norm(np.array(p1[:2]) - np.array(p2[:2]))
+        return math.hypot(p1[0] - p2[0], p1[1] - p2[1])
     
     @staticmethod
-    def analyze_joints(points):
-        """Analyze all joint angles"""
-        joints = {
-            'right_elbow': BodyScience.calculate_angle(points[2], points[3], points[4]),  # RShoulder-RElbow-RWrist
-            'left_elbow': BodyScience.calculate_angle(points[5], points[6], points[7]),   # LShoulder-LElbow-LWrist
-            'right_knee': BodyScience.calculate_angle(points[8], points[9], points[10]),  # RHip-RKnee-RAnkle
-            'left_knee': BodyScience.calculate_angle(points[11], points[12], points[13]), # LHip-LKnee-LAnkle
-            'right_hip': BodyScience.calculate_angle(points[2], points[8], points[9]),    # RShoulder-RHip-RKnee
-            'left_hip': BodyScience.calculate_angle(points[5], points[11], points[12]),   # LShoulder-LHip-LKnee
-        }
-        return {k: v for k, v in joints.items() if v is not None}
+    def analyze_joints(P):
+        """Analyze all joint angles from the packed (N, 3) keypoint array"""
+        # All six angles in one vectorized pass
+        P = _coords(P)
+        A = P[_JOINT_TRIPLES[:, 0]]
+        B = P[_JOINT_TRIPLES[:, 1]]
+        C = P[_JOINT_TRIPLES[:, 2]]
+        BA = A - B
+        BC = C - B
+        
+        cos_angle = (BA * BC).sum(axis=1) / (np.linalg.norm(BA, axis=1) * np.linalg.norm(BC, axis=1) + 1e-6)
+        angles = np.degrees(np.arccos(np.clip(cos_angle, -1, 1)))
+        
+        # Joints with a missing keypoint come out as NaN
+        return {name: angle for name, angle in zip(_JOINT_NAMES, angles) if not np.isnan(angle)}
     
     @staticmethod
-    def analyze_symmetry(points):
-        """Analyze left-right body symmetry"""
+    def analyze_symmetry(P):
+        """Analyze left-right body symmetry from the packed (N, 3) keypoint array"""
         symmetries = {}
+        P = _coords(P)
         
-        # Shoulder width
-        if points[2] and points[5]:
-            r_shoulder = np.array(points[2][:2])
-            l_shoulder = np.array(points[5][:2])
-            symmetries['shoulder_width'] = np.linalg.norm(r_shoulder - l_shoulder)
+        # Measure every segment at once; segments with a missing endpoint come out as NaN
+        seg = P[_SYMMETRY_PAIRS[:, 0]] - P[_SYMMETRY_PAIRS[:, 1]]
+        shoulder_width, hip_width, r_arm, l_arm, r_leg, l_leg = np.hypot(seg[:, 0], seg[:, 1])
         
-        # Hip width
-        if points[8] and points[11]:
-            r_hip = np.array(points[8][:2])
-            l_hip = np.array(points[11][:2])
-            symmetries['hip_width'] = np.linalg.norm(r_hip - l_hip)
+        # Shoulder / hip width
+        if not np.isnan(shoulder_width):
+            symmetries['shoulder_width'] = shoulder_width
+        if not np.isnan(hip_width):
+            symmetries['hip_width'] = hip_width
         
         # Arm length symmetry
-        if points[2] and points[4] and points[5] and points[7]:
-            r_arm = BodyScience.calculate_distance(points[2], points[4])
-            l_arm = BodyScience.calculate_distance(points[5], points[7])
-            if r_arm and l_arm:
-                symmetries['arm_symmetry'] = abs(r_arm - l_arm) / max(r_arm, l_arm) * 100
+        if r_arm > 0 and l_arm > 0:
+            symmetries['arm_symmetry'] = abs(r_arm - l_arm) / max(r_arm, l_arm) * 100
         
         # Leg length symmetry
-        if points[8] and points[10] and points[11] and points[13]:
-            r_leg = BodyScience.calculate_distance(points[8], points[10])
-            l_leg = BodyScience.calculate_distance(points[11], points[13])
-            if r_leg and l_leg:
-                symmetries['leg_symmetry'] = abs(r_leg - l_leg) / max(r_leg, l_leg) * 100
+        if r_leg > 0 and l_leg > 0:
+            symmetries['leg_symmetry'] = abs(r_leg - l_leg) / max(r_leg, l_leg) * 100
         
         return symmetries
     
     @staticmethod
-    def analyze_center_of_gravity(points):
-        """Estimate center of gravity and balance"""
-        valid_points = [p for p in points if p is not None]
-        if not valid_points:
+    def analyze_center_of_gravity(P):
+        """Estimate center of gravity and balance from the packed (N, 3) keypoint array"""
+        P = _coords(P)
+        valid = ~np.isnan(P[:, 0])
+        if not valid.any():
             return None
         
-        coords = np.array([p[:2] for p in valid_points])
-        cog = np.mean(coords, axis=0)
+        cog = np.nanmean(P, axis=0)
         
         # Check if CoG is within body bounds
-        if points[8] and points[11]:  # Hips
-            hip_y = (points[8][1] + points[11][1]) / 2
-            if points[10] and points[13]:  # Ankles
-                ankle_y = max(points[10][1], points[13][1])
-                base_width = abs(points[10][0] - points[13][0]) if points[10] and points[13] else 100
-                balance_score = 100 - (abs(cog[0] - (points[10][0] + points[13][0])/2) / max(base_width, 1) * 100)
+        if valid[8] and valid[11]:  # Hips
+            if valid[10] and valid[13]:  # Ankles
+                r_ankle_x, l_ankle_x = P[10, 0], P[13, 0]
+                base_width = abs(r_ankle_x - l_ankle_x)
+                balance_score = 100 - (abs(cog[0] - (r_ankle_x + l_ankle_x) / 2) / max(base_width, 1) * 100)
                 balance_score = np.clip(balance_score, 0, 100)
                 
                 return {'cog': cog, 'balance_score': balance_score}
         
         return {'cog': cog, 'balance_score': 50}
+    
+    @staticmethod
+    def analyze_all(P):
+        """
+        Run joint, symmetry and center-of-gravity analysis in a single pass
+        
+        Uses the compiled kernel when Numba is available, otherwise the
+        vectorized NumPy analyzers above.
+        
+        Returns:
+            (joints, symmetry, cog_data) - same shapes as the individual analyzers
+        """
+        if not HAS_NUMBA or P.shape[0] != 18:
+            return (BodyScience.analyze_joints(P),
+                    BodyScience.analyze_symmetry(P),
+                    BodyScience.analyze_center_of_gravity(P))
+        
+        angles, sym, cog, balance = _compute(P, ~np.isnan(P[:, 0]))
+        
+        joints = {name: angle for name, angle in zip(_JOINT_NAMES, angles) if not np.isnan(angle)}
+        symmetry = {name: value for name, value in zip(_SYMMETRY_NAMES, sym) if not np.isnan(value)}
+        cog_data = {'cog': cog, 'balance_score': balance} if not np.isnan(cog[0]) else None
+        
+        return joints, symmetry, cog_data
+
+
+# Compile the kernel at import so the first frame doesn't pay the JIT cost
+if HAS_NUMBA:
+    _compute(np.zeros((18, 3), dtype=np.float32), np.ones(18, dtype=np.bool_))
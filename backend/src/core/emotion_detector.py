@@ -3,9 +3,37 @@ Emotion Detection Module
 Uses Haar cascades and facial analysis to detect emotions
 """
 
+import os
+import threading
+
 import cv2
 import numpy as np
 
+# Emotion scores are a linear function of the face features:
+#   scores = _EMOTION_WEIGHTS @ [smiles, eyes, mouth_smile, max(0, 100 - brightness),
+#                                max(0, brightness - 140), max(0, 30 * eyes - 15)] + _EMOTION_BIAS
+_EMOTION_NAMES = ('happy', 'neutral', 'sad', 'angry', 'surprised', 'fearful', 'disgusted')
+_EMOTION_WEIGHTS = np.array([
+    [35,   8,  0.3, 0,    0,   0],  # happy
+    [-8,  -3, -0.2, 0,    0,   0],  # neutral
+    [-12,  0, -0.1, 0,    0,   0],  # sad
+    [0,    0,  0,   0.25, 0,   0],  # angry
+    [0,    0,  0,   0,    0,   1],  # surprised
+    [0,    0,  0,   0.4,  0,   0],  # fearful
+    [0,    0,  0,   0,    0.5, 0],  # disgusted
+])
+_EMOTION_BIAS = np.array([15, 45, 15, 12, 0, 0, 8], dtype=np.float64)
+
+# Parsed cascades, shared by every detector instance
+_CASCADES = {}
+
+
+def _get_cascade(name):
+    """Load a bundled Haar cascade once and reuse it afterwards"""
+    if name not in _CASCADES:
+        _CASCADES[name] = cv2.CascadeClassifier(cv2.data.haarcascades + name)
+    return _CASCADES[name]
+
 
 class SimpleEmotionDetector:
     """
@@ -13,38 +41,84 @@ class SimpleEmotionDetector:
     Detects: happy, sad, angry, neutral, surprised, fearful, disgusted
     """
     
+    # Face cascades run on a copy downscaled to this width
+    FACE_DETECT_WIDTH = 320
+    
+    # Largest face (full-resolution pixels) the cascades scan for; bounding the
+    # window size stops the scale pyramid early instead of running to frame size
+    FACE_MAX_SIZE = 300
+    
+    # Optional INT8 YuNet face model; the Haar cascades are used when it is absent
+    YUNET_MODEL = "openpose/models/face/face_detection_yunet_2023mar_int8.onnx"
+    YUNET_SCORE_THRESHOLD = 0.6
+    
     def __init__(self):
-        self.face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        )
-        self.face_alt = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_frontalface_alt.xml'
-        )
-        self.face_alt2 = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_frontalface_alt2.xml'
-        )
-        self.smile_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_smile.xml'
-        )
-        self.eye_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_eye.xml'
-        )
-        print("✓ Emotion Detector loaded (multi-cascade face + smile + eye analysis)")
+        self.face_cascade = _get_cascade('haarcascade_frontalface_default.xml')
+        self.face_alt = _get_cascade('haarcascade_frontalface_alt.xml')
+        self.face_alt2 = _get_cascade('haarcascade_frontalface_alt2.xml')
+        self.smile_cascade = _get_cascade('haarcascade_smile.xml')
+        self.eye_cascade = _get_cascade('haarcascade_eye.xml')
+        
+        # CLAHE operator and grayscale buffer reused across frames. Kept per
+        # thread since frames are processed on a thread pool and neither the
+        # buffer nor the CLAHE instance is safe to share.
+        self._local = threading.local()
+        
+        # OpenCV transparent API: with OpenCL available, cvtColor/CLAHE/resize
+        # and the face cascades run on the GPU when given a UMat
+        self._use_umat = cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL()
+        
+        # One DNN pass replaces the Haar fallback ladder when the model is present
+        self._use_yunet = hasattr(cv2, 'FaceDetectorYN') and os.path.exists(self.YUNET_MODEL)
+        
+        if self._use_yunet:
+            print("✓ Emotion Detector loaded (YuNet face + smile + eye analysis)")
+        else:
+            print("✓ Emotion Detector loaded (multi-cascade face + smile + eye analysis)")
     
     def detect(self, frame):
         """Detect emotion in frame with multiple fallback strategies"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        clahe, gray = self._get_buffers(frame.shape[:2])
         
-        # Enhance contrast for better detection
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        gray = clahe.apply(gray)
-        
-        # Try multiple cascade classifiers with different parameters
-        faces = self._detect_faces_robust(gray)
-        
-        if len(faces) == 0:
-            return None
+        if self._use_yunet:
+            faces = self._detect_faces_yunet(frame)
+            
+            if len(faces) == 0:
+                return None
+            
+            # Grayscale is only needed for the smile/eye/mouth analysis
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+            clahe.apply(gray, dst=gray)
+        elif self._use_umat:
+            gray_umat = cv2.cvtColor(cv2.UMat(frame), cv2.COLOR_BGR2GRAY)
+            
+            # Enhance contrast for better detection
+            gray_umat = clahe.apply(gray_umat)
+            
+            # Try multiple cascade classifiers with different parameters
+            faces = self._detect_faces_robust(gray_umat, frame.shape[1])
+            
+            if len(faces) == 0:
+                return None
+            
+            # Download only once a face was found; ROI work below is on host memory
+            gray = gray_umat.get()
+        else:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+            
+            # Enhance contrast for better detection
+            clahe.apply(gray, dst=gray)
+            
+            # Try multiple cascade classifiers with different parameters
+            faces = self._detect_faces_robust(gray, frame.shape[1])
+            
+            if len(faces) == 0:
+                return None
         
+        return self._analyze_face(frame, gray, faces)
+    
+    def _analyze_face(self, frame, gray, faces):
+        """Score emotions for the largest of the detected faces"""
         # Process largest face
         (x, y, w, h) = max(faces, key=lambda f: f[2] * f[3])
         
@@ -74,62 +148,121 @@ class SimpleEmotionDetector:
             minSize=(int(w*0.1), int(h*0.1))
         )
         
-        # Analyze face texture and brightness
+        # Analyze face brightness
         brightness = cv2.mean(face_roi_gray)[0]
-        # Variance indicates emotion intensity
-        variance = cv2.Laplacian(face_roi_gray, cv2.CV_64F).var()
         
         # Analyze mouth region for smile detection
         mouth_smile_score = self._detect_mouth(face_roi_gray, h)
         
         # Calculate emotion scores based on features
-        emotions = self._calculate_emotions(
-            smiles, eyes, brightness, variance, 
+        scores = self._calculate_emotions(
+            smiles, eyes, brightness,
             face_roi_gray, mouth_smile_score
         )
+        best = int(np.argmax(scores))
         
         return {
             'face_region': (x, y, w, h),
-            'dominant_emotion': max(emotions, key=emotions.get),
-            'confidence': max(emotions.values()),
-            'emotions': emotions
+            'dominant_emotion': _EMOTION_NAMES[best],
+            'confidence': float(scores[best]),
+            'emotions': dict(zip(_EMOTION_NAMES, scores.tolist()))
         }
     
-    def _detect_faces_robust(self, gray):
-        """Try multiple cascade classifiers to detect faces"""
+    def _get_buffers(self, shape):
+        """Get this thread's CLAHE operator and a grayscale buffer of the given shape"""
+        local = self._local
+        if not hasattr(local, 'clahe'):
+            local.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+            local.gray_buf = None
+        if local.gray_buf is None or local.gray_buf.shape != shape:
+            local.gray_buf = np.empty(shape, dtype=np.uint8)
+        return local.clahe, local.gray_buf
+    
+    def _detect_faces_yunet(self, frame):
+        """Detect faces with the YuNet DNN on a downscaled copy of the BGR frame"""
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.FACE_DETECT_WIDTH / width)
+        if scale < 1.0:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
+        # The detector keeps its input size as state, so each thread gets its own
+        local = self._local
+        if not hasattr(local, 'yunet'):
+            local.yunet = cv2.FaceDetectorYN.create(
+                self.YUNET_MODEL, "", (frame.shape[1], frame.shape[0]),
+                score_threshold=self.YUNET_SCORE_THRESHOLD
+            )
+        local.yunet.setInputSize((frame.shape[1], frame.shape[0]))
+        
+        _, detections = local.yunet.detect(frame)
+        if detections is None:
+            return []
+        
+        # Rows are x, y, w, h, 5 landmarks, score; clip boxes to the frame
+        faces = []
+        for x, y, w, h in detections[:, :4] / scale:
+            x0, y0 = max(0, int(round(x))), max(0, int(round(y)))
+            x1, y1 = min(width, int(round(x + w))), min(height, int(round(y + h)))
+            if x1 > x0 and y1 > y0:
+                faces.append((x0, y0, x1 - x0, y1 - y0))
+        return faces
+    
+    def _detect_faces_robust(self, gray, width):
+        """
+        Try multiple cascade classifiers to detect faces
+        
+        Args:
+            gray: Grayscale frame (ndarray or UMat)
+            width: Frame width in pixels (a UMat has no shape)
+        """
+        # Haar cost scales with pixel count, so scan a downscaled copy and
+        # map the boxes back to full resolution afterwards
+        scale = min(1.0, self.FACE_DETECT_WIDTH / width)
+        if scale < 1.0:
+            small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        else:
+            small = gray
+        min_size = (int(30 * scale), int(30 * scale))
+        max_size = (int(self.FACE_MAX_SIZE * scale), int(self.FACE_MAX_SIZE * scale))
+        
         faces = []
         
         # Method 1: Default cascade with sensitive parameters
         f1 = self.face_cascade.detectMultiScale(
-            gray, scaleFactor=1.05, minNeighbors=4, minSize=(30, 30)
+            small, scaleFactor=1.05, minNeighbors=4, minSize=min_size, maxSize=max_size
         )
         faces.extend(f1)
         
         # Method 2: Alternative cascade
         if len(faces) == 0:
             f2 = self.face_alt.detectMultiScale(
-                gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30)
+                small, scaleFactor=1.1, minNeighbors=5, minSize=min_size, maxSize=max_size
             )
             faces.extend(f2)
         
         # Method 3: Another alternative
         if len(faces) == 0:
             f3 = self.face_alt2.detectMultiScale(
-                gray, scaleFactor=1.1, minNeighbors=6, minSize=(30, 30)
+                small, scaleFactor=1.1, minNeighbors=6, minSize=min_size, maxSize=max_size
             )
             faces.extend(f3)
         
         # Method 4: Very sensitive search if still no faces
         if len(faces) == 0:
             f4 = self.face_cascade.detectMultiScale(
-                gray, scaleFactor=1.03, minNeighbors=2, minSize=(20, 20)
+                small, scaleFactor=1.03, minNeighbors=2, minSize=(int(20 * scale), int(20 * scale)),
+                maxSize=max_size
             )
             faces.extend(f4)
         
         # Remove duplicates (overlapping detections)
-        if faces:
+        if len(faces) > 1:
             faces = self._remove_overlaps(faces)
         
+        # Back to full-resolution coordinates
+        if scale < 1.0:
+            faces = [tuple(int(round(v / scale)) for v in face) for face in faces]
+        
         return faces
     
     def _remove_overlaps(self, faces):
@@ -137,23 +270,12 @@ class SimpleEmotionDetector:
         if len(faces) <= 1:
             return faces
         
-        # Sort by area (largest first)
-        faces = sorted(faces, key=lambda f: f[2]*f[3], reverse=True)
-        
-        result = [faces[0]]
-        for face in faces[1:]:
-            x1, y1, w1, h1 = face
-            overlaps = False
-            for rx, ry, rw, rh in result:
-                # Check if faces overlap
-                if not (x1 + w1 < rx or rx + rw < x1 or 
-                        y1 + h1 < ry or ry + rh < y1):
-                    overlaps = True
-                    break
-            if not overlaps:
-                result.append(face)
-        
-        return result
+        # NMS in OpenCV: ranked by area, any overlap with a larger face is dropped
+        boxes = [[int(v) for v in face] for face in faces]
+        areas = [float(w * h) for _, _, w, h in boxes]
+        keep = cv2.dnn.NMSBoxes(boxes, areas, score_threshold=0.0, nms_threshold=0.0)
+        
+        return [faces[i] for i in np.asarray(keep).flatten()]
     
     def _detect_mouth(self, face_roi_gray, face_height):
         """Detect smile by analyzing mouth region"""
@@ -163,7 +285,10 @@ class SimpleEmotionDetector:
             mouth_roi = face_roi_gray[mouth_y:, :]
             
             # High variance in mouth region indicates smiling
-            mouth_var = cv2.Laplacian(mouth_roi, cv2.CV_64F).var()
+            # (int16 holds the 3x3 Laplacian of uint8 exactly at a quarter of the bytes)
+            lap = cv2.Laplacian(mouth_roi, cv2.CV_16S)
+            _, stddev = cv2.meanStdDev(lap)
+            mouth_var = float(stddev[0, 0]) ** 2
             
             # Normalize to 0-100 scale
             mouth_score = min(100, mouth_var / 5)
@@ -171,25 +296,24 @@ class SimpleEmotionDetector:
         except:
             return 0
     
-    def _calculate_emotions(self, smiles, eyes, brightness, variance, face_roi, mouth_smile):
-        """Calculate emotion probabilities"""
+    def _calculate_emotions(self, smiles, eyes, brightness, face_roi, mouth_smile):
+        """Calculate emotion probabilities, ordered as _EMOTION_NAMES"""
         smile_count = len(smiles)
         eye_count = len(eyes)
         
-        # Enhanced emotion scores with mouth analysis
-        emotions = {
-            'happy': 15 + (smile_count * 35) + (eye_count * 8) + (mouth_smile * 0.3),
-            'neutral': 35 - (smile_count * 8) - (eye_count * 3) + (50 - mouth_smile) * 0.2,
-            'sad': 10 - (smile_count * 12) + (50 - mouth_smile) * 0.1,
-            'angry': 12 + (max(0, 100 - brightness) / 4),
-            'surprised': max(0, eye_count * 30 - 15),
-            'fearful': max(0, (100 - brightness) / 2.5),
-            'disgusted': 8 + (max(0, brightness - 140) / 2)
-        }
+        features = np.array([
+            smile_count,
+            eye_count,
+            mouth_smile,
+            max(0, 100 - brightness),
+            max(0, brightness - 140),
+            max(0, eye_count * 30 - 15),
+        ], dtype=np.float64)
+        scores = _EMOTION_WEIGHTS @ features + _EMOTION_BIAS
         
         # Normalize to percentages
-        total = sum(emotions.values())
+        total = scores.sum()
         if total > 0:
-            emotions = {k: (v / total) * 100 for k, v in emotions.items()}
+            scores *= 100 / total
         
-        return emotions
+        return scores
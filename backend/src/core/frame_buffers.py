@@ -0,0 +1,47 @@
+"""
+Frame Buffer Pool
+Reusable decode targets so incoming frames don't allocate a new image each
+"""
+
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class FrameBufferPool:
+    """
+    Per-session pool of uint8 image arrays, keyed by shape
+    
+    Frames are decoded into an acquired buffer and handed back with release()
+    once the pipeline is done with them. Buffers live as long as the session,
+    so a fixed client resolution settles into a handful of arrays that are
+    reused for every frame.
+    """
+    
+    def __init__(self, max_free: int = 8):
+        """
+        Args:
+            max_free: Most idle buffers kept per shape
+        """
+        self.max_free = max_free
+        self._free: Dict[Tuple[int, ...], List[np.ndarray]] = {}
+        self._lock = threading.Lock()
+    
+    def acquire(self, shape: Tuple[int, ...]) -> np.ndarray:
+        """An idle buffer of the given shape, or a new one if none is free"""
+        with self._lock:
+            free = self._free.get(shape)
+            if free:
+                return free.pop()
+        return np.empty(shape, dtype=np.uint8)
+    
+    def release(self, buf: np.ndarray) -> None:
+        """Return a buffer to the pool; the caller must not touch it afterwards"""
+        if buf.dtype != np.uint8 or not buf.flags.c_contiguous:
+            return
+        
+        with self._lock:
+            free = self._free.setdefault(buf.shape, [])
+            if len(free) < self.max_free:
+                free.append(buf)
@@ -0,0 +1,16 @@
+"""
+JIT Module
+Optional Numba acceleration for the per-frame numeric kernels
+"""
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # Numba not installed - kernels run as plain Python
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit (supports both @njit and @njit(...))"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
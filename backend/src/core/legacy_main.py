@@ -7,6 +7,8 @@ Main application file that orchestrates all modules.
 
 import cv2
 import os
+import queue
+import threading
 
 from src.core.pose_detector import PoseDetector
 from src.core.posture_analyzer import PostureAnalyzer
@@ -15,6 +17,41 @@ from src.core.visualization import draw_skeleton, draw_info_panel
 from src.core.logger import MotionLogger
 
 
+# Body science + the per-frame report run for every Nth frame
+ANALYSIS_INTERVAL = 5
+
+# Frames per forward pass: batching raises throughput (mostly on GPU) at
+# the cost of BATCH/FPS extra latency; 1 for the most responsive display
+DETECT_BATCH = int(os.environ.get("LEGACY_DETECT_BATCH", "2"))
+
+
+def _analysis_worker(frames: queue.Queue, logger: MotionLogger, points_names):
+    """Body science analysis and logging, off the capture/display thread"""
+    while True:
+        item = frames.get()
+        if item is None:
+            break
+        
+        frame_count, P, posture, movement, emotion, activities = item
+        
+        # Body Science calculations
+        joints, symmetry, cog_data = BodyScience.analyze_all(P)
+        
+        # Log comprehensive frame analysis
+        logger.log_frame_analysis(
+            frame_count, 
+            P, 
+            points_names,
+            joints,
+            symmetry,
+            cog_data,
+            posture,
+            movement,
+            emotion,
+            activities
+        )
+
+
 def main():
     # Initialize logger
     logger = MotionLogger()
@@ -34,7 +71,9 @@ def main():
         return
     
     logger.log(f"Loading model from: {model_file}")
-    detector = PoseDetector(model_file, config_file, use_cuda=False)
+    # GPU when available (falls back to CPU); a 256px input is plenty for
+    # one full-body pose in a 640x480 webcam frame
+    detector = PoseDetector(model_file, config_file, use_cuda=True, input_size=(256, 256))
     
     # Initialize analyzers
     postureAnalyzer = PostureAnalyzer()
@@ -49,63 +88,75 @@ def main():
     cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
     cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
     
-    logger.log("Running on CPU")
+    logger.log(f"Running on {detector.backend_name}")
     logger.log("[OK] Webcam active! Press 'q' to quit")
     logger.log("Real-time Analysis:")
     logger.log("-" * 60)
     
     frame_count = 0
     
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
+    # Single slot: the display loop never waits on analysis, a stale frame
+    # is replaced by the newest one
+    analysis_queue = queue.Queue(maxsize=1)
+    analysis_thread = threading.Thread(target=_analysis_worker,
+                                       args=(analysis_queue, logger, detector.points_names),
+                                       daemon=True)
+    analysis_thread.start()
+    
+    running = True
+    while running:
+        # Capture a batch of frames for one forward pass
+        frames = []
+        while len(frames) < DETECT_BATCH:
+            ret, frame = cap.read()
+            if not ret:
+                running = False
+                break
+            frames.append(frame)
         
-        frame_count += 1
+        if not frames:
+            break
         
         # Detect pose
-        points, _ = detector.detect(frame)
-        
-        # Draw skeleton
-        frame = draw_skeleton(frame, points, detector.pose_pairs)
-        
-        # Analyze posture
-        posture = postureAnalyzer.analyze_posture(points)
-        movement = postureAnalyzer.analyze_movement(points)
-        activities = postureAnalyzer.detect_activity(points)
-        emotion = postureAnalyzer.analyze_facial_sentiment(frame, points)
+        detections = detector.detect_batch(frames) if len(frames) > 1 else [detector.detect(frames[0])]
         
-        # Draw info panel
-        frame = draw_info_panel(frame, posture, movement, emotion)
-        
-        # Show frame
-        cv2.imshow('Motion & Emotion Analysis', frame)
-        
-        # Terminal output (every frame for detailed logging)
-        if frame_count % 1 == 0:
-            # Body Science calculations
-            joints = BodyScience.analyze_joints(points)
-            symmetry = BodyScience.analyze_symmetry(points)
-            cog_data = BodyScience.analyze_center_of_gravity(points)
+        for frame, (P, _) in zip(frames, detections):
+            frame_count += 1
             
-            # Log comprehensive frame analysis
-            logger.log_frame_analysis(
-                frame_count, 
-                points, 
-                detector.points_names,
-                joints,
-                symmetry,
-                cog_data,
-                posture,
-                movement,
-                emotion,
-                activities
-            )
-        
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+            # Draw skeleton
+            frame = draw_skeleton(frame, P, detector.pose_pairs)
+            
+            # Analyze posture
+            posture = postureAnalyzer.analyze_posture(P)
+            movement = postureAnalyzer.analyze_movement(P)
+            activities = postureAnalyzer.detect_activity(P)
+            emotion = postureAnalyzer.analyze_facial_sentiment(frame, P)
+            
+            # Draw info panel
+            frame = draw_info_panel(frame, posture, movement, emotion)
+            
+            # Show frame
+            cv2.imshow('Motion & Emotion Analysis', frame)
+            
+            # Terminal output, analyzed and logged on the worker thread
+            if frame_count % ANALYSIS_INTERVAL == 0:
+                item = (frame_count, P, posture, movement, emotion, activities)
+                try:
+                    analysis_queue.put_nowait(item)
+                except queue.Full:
+                    try:
+                        analysis_queue.get_nowait()
+                    except queue.Empty:
+                        pass
+                    analysis_queue.put_nowait(item)
+            
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                running = False
+                break
     
     # Clean up
+    analysis_queue.put(None)
+    analysis_thread.join()
     cap.release()
     cv2.destroyAllWindows()
     logger.close()
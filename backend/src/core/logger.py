@@ -4,23 +4,52 @@ Handles simultaneous logging to terminal and file
 """
 
 import os
+import queue
+import threading
 from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+# Banner and divider lines, built once
+_BANNER = "=" * 80
+_DIV = "-" * 80
+
+# Opening lines of every frame report
+_FRAME_HEADER = f"""
+{_BANNER}
+FRAME {{:04d}} - COMPREHENSIVE BODY SCIENCE ANALYSIS
+{_BANNER}
+
+[KEYPOINTS] KEYPOINT POSITIONS (18-Point Pose):
+{_DIV}"""
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """os.write until every byte of data has reached the file"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
 
 
 class MotionLogger:
     """Logger that writes to both terminal and file simultaneously"""
     
-    def __init__(self, log_dir="logs", filename_prefix="motion_analysis"):
+    def __init__(self, log_dir: str = "logs", filename_prefix: str = "motion_analysis",
+                 verbose: bool = True):
         """
         Initialize logger
         
         Args:
             log_dir: Directory to store log files
             filename_prefix: Prefix for log filenames
+            verbose: Whether log() echoes messages to the terminal
         """
         self.log_dir = log_dir
         self.filename_prefix = filename_prefix
-        self.log_file = None
+        self._fd: Optional[int] = None
+        self.verbose = verbose
+        
+        # 1 = session messages only, 2 = also the per-frame analysis report
+        self.level = int(os.environ.get("MOTION_LOG_LEVEL", "2"))
         
         # Create logs directory if it doesn't exist
         if not os.path.exists(self.log_dir):
@@ -31,24 +60,48 @@ class MotionLogger:
         log_filename = f"{self.filename_prefix}_{timestamp}.log"
         self.log_path = os.path.join(self.log_dir, log_filename)
         
-        # Open log file in write mode
-        self.log_file = open(self.log_path, 'w', encoding='utf-8')
+        # Raw file descriptor: text is encoded once per batch and handed to
+        # os.write from a background thread, so the analysis loop never waits
+        # on disk and no TextIOWrapper/BufferedWriter layers sit in between
+        self._fd = os.open(self.log_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
         
         # Write header
         header = f"""
-{'='*80}
+{_BANNER}
 Motion Analysis System - Session Log
 Started: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
 Log File: {self.log_path}
-{'='*80}
+{_BANNER}
 
 """
-        self.log_file.write(header)
-        self.log_file.flush()
+        _write_all(self._fd, header.encode('utf-8'))
+        
+        self._writer_thread = threading.Thread(target=self._writer, args=(self._fd,), name="MotionLoggerWriter", daemon=True)
+        self._writer_thread.start()
         
         print(f"[LOG] Logging to: {self.log_path}")
     
-    def log(self, message, to_terminal=True):
+    def _writer(self, fd: int) -> None:
+        """Drain queued log text, writing everything pending in one os.write"""
+        running = True
+        while running:
+            pending: List[str] = []
+            item = self._queue.get()
+            while True:
+                if item is None:
+                    running = False
+                    break
+                pending.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            
+            if pending:
+                _write_all(fd, ''.join(pending).encode('utf-8'))
+    
+    def log(self, message: str, to_terminal: bool = True) -> None:
         """
         Log message to both file and terminal
         
@@ -56,21 +109,24 @@ Log File: {self.log_path}
             message: Message to log
             to_terminal: Whether to also print to terminal (default: True)
         """
-        if self.log_file and not self.log_file.closed:
-            self.log_file.write(message + '\n')
-            self.log_file.flush()  # Ensure immediate write
+        if self._fd is not None:
+            self._queue.put(message + '\n')
         
-        if to_terminal:
+        if to_terminal and self.verbose:
             print(message)
     
-    def log_frame_analysis(self, frame_num, points, points_names, joints, symmetry, 
-                          cog_data, posture, movement, emotion, activities):
+    def log_frame_analysis(self, frame_num: int, points: Sequence[Optional[Sequence[float]]],
+                           points_names: Sequence[str], joints: Dict[str, float],
+                           symmetry: Dict[str, float], cog_data: Optional[Dict[str, Any]],
+                           posture: Optional[Dict[str, Any]], movement: Dict[str, Any],
+                           emotion: Dict[str, Any], activities: List[str]) -> None:
         """
         Log comprehensive frame analysis
         
         Args:
             frame_num: Frame number
-            points: Detected keypoints
+            points: Detected keypoints (list with None for missing points, or
+                a packed (N, 3) array with NaN rows)
             points_names: Names of keypoints
             joints: Joint angle analysis
             symmetry: Body symmetry analysis
@@ -80,99 +136,105 @@ Log File: {self.log_path}
             emotion: Emotion analysis
             activities: Detected activities
         """
-        output = []
-        
-        output.append(f"\n{'='*80}")
-        output.append(f"FRAME {frame_num:04d} - COMPREHENSIVE BODY SCIENCE ANALYSIS")
-        output.append(f"{'='*80}")
-        
-        # Keypoint positions
-        output.append("\n[KEYPOINTS] KEYPOINT POSITIONS (18-Point Pose):")
-        output.append("-" * 80)
-        for i, point in enumerate(points):
-            if point is not None:
-                output.append(f"  {points_names[i]:12s} : X={point[0]:7.1f} Y={point[1]:7.1f} Confidence={point[2]:5.2f}")
+        # Skip building the report entirely when frame logging is off
+        if self.level < 2:
+            return
+        
+        # Header and keypoint positions
+        sections: List[str] = [_FRAME_HEADER.format(frame_num)]
+        sections.extend(
+            f"  {points_names[i]:12s} : X={point[0]:7.1f} Y={point[1]:7.1f} Confidence={point[2]:5.2f}"
+            for i, point in enumerate(points)
+            if point is not None and point[0] == point[0]  # NaN marks a missing packed point
+        )
         
         # Joint angles
-        output.append(f"\n[JOINTS] JOINT ANGLES (Degrees):")
-        output.append("-" * 80)
-        for joint_name, angle in joints.items():
-            if angle is not None:
-                status = "LOCKED" if angle < 30 else "BENT" if angle < 120 else "EXTENDED"
-                output.append(f"  {joint_name:15s} : {angle:6.1f}° [{status}]")
+        sections.append(f"""
+[JOINTS] JOINT ANGLES (Degrees):
+{_DIV}""")
+        sections.extend(
+            f"  {joint_name:15s} : {angle:6.1f}° [{'LOCKED' if angle < 30 else 'BENT' if angle < 120 else 'EXTENDED'}]"
+            for joint_name, angle in joints.items() if angle is not None
+        )
         
         # Body symmetry
-        output.append(f"\n[SYMMETRY] BODY SYMMETRY ANALYSIS:")
-        output.append("-" * 80)
+        sections.append(f"""
+[SYMMETRY] BODY SYMMETRY ANALYSIS:
+{_DIV}""")
         if 'shoulder_width' in symmetry:
-            output.append(f"  Shoulder Width  : {symmetry['shoulder_width']:6.1f} pixels")
+            sections.append(f"  Shoulder Width  : {symmetry['shoulder_width']:6.1f} pixels")
         if 'hip_width' in symmetry:
-            output.append(f"  Hip Width       : {symmetry['hip_width']:6.1f} pixels")
-        if 'arm_symmetry' in symmetry:
-            asymmetry = symmetry['arm_symmetry']
-            status = "PERFECT" if asymmetry < 5 else "BALANCED" if asymmetry < 15 else "UNBALANCED"
-            output.append(f"  Arm Asymmetry   : {asymmetry:5.1f}% [{status}]")
-        if 'leg_symmetry' in symmetry:
-            asymmetry = symmetry['leg_symmetry']
-            status = "PERFECT" if asymmetry < 5 else "BALANCED" if asymmetry < 15 else "UNBALANCED"
-            output.append(f"  Leg Asymmetry   : {asymmetry:5.1f}% [{status}]")
+            sections.append(f"  Hip Width       : {symmetry['hip_width']:6.1f} pixels")
+        for key, label in (('arm_symmetry', 'Arm'), ('leg_symmetry', 'Leg')):
+            if key in symmetry:
+                asymmetry = symmetry[key]
+                status = "PERFECT" if asymmetry < 5 else "BALANCED" if asymmetry < 15 else "UNBALANCED"
+                sections.append(f"  {label} Asymmetry   : {asymmetry:5.1f}% [{status}]")
         
         # Center of gravity
-        output.append(f"\n[BALANCE] CENTER OF GRAVITY & BALANCE:")
-        output.append("-" * 80)
+        sections.append(f"""
+[BALANCE] CENTER OF GRAVITY & BALANCE:
+{_DIV}""")
         if cog_data:
-            output.append(f"  CoG Position    : X={cog_data['cog'][0]:7.1f} Y={cog_data['cog'][1]:7.1f}")
-            balance_status = "STABLE" if cog_data['balance_score'] > 70 else "MODERATE" if cog_data['balance_score'] > 40 else "UNSTABLE"
-            output.append(f"  Balance Score   : {cog_data['balance_score']:5.1f}/100 [{balance_status}]")
+            balance_score = cog_data['balance_score']
+            balance_status = "STABLE" if balance_score > 70 else "MODERATE" if balance_score > 40 else "UNSTABLE"
+            sections.append(f"""\
+  CoG Position    : X={cog_data['cog'][0]:7.1f} Y={cog_data['cog'][1]:7.1f}
+  Balance Score   : {balance_score:5.1f}/100 [{balance_status}]""")
         
         # Posture
         if posture:
-            output.append(f"\n[POSTURE] POSTURE ANALYSIS:")
-            output.append("-" * 80)
-            output.append(f"  Status          : {posture['status']}")
-            output.append(f"  Spine Angle     : {posture['angle']:6.1f}° from vertical")
-            output.append(f"  Shoulder Align  : {'Balanced' if posture['shoulder_aligned'] else 'Unbalanced' if posture['shoulder_aligned'] is not None else 'Unknown'}")
-        
-        # Movement
-        output.append(f"\n[MOVEMENT] MOVEMENT & DYNAMICS:")
-        output.append("-" * 80)
-        output.append(f"  Energy Level    : {movement['energy']}")
-        output.append(f"  Movement Score  : {movement['movement_score']:8.2f}")
-        output.append(f"  Velocity        : {movement['velocity']:6.2f} px/frame")
-        output.append(f"  Sentiment       : {movement['sentiment']}")
-        
-        # Emotion
-        output.append(f"\n[EMOTION] FACIAL EMOTION & SENTIMENT:")
-        output.append("-" * 80)
-        output.append(f"  Dominant        : {emotion['emotion']}")
-        output.append(f"  Sentiment       : {emotion['sentiment']}")
-        output.append(f"  Confidence      : {emotion['confidence']}%")
+            aligned = posture['shoulder_aligned']
+            sections.append(f"""
+[POSTURE] POSTURE ANALYSIS:
+{_DIV}
+  Status          : {posture['status']}
+  Spine Angle     : {posture['angle']:6.1f}° from vertical
+  Shoulder Align  : {'Balanced' if aligned else 'Unbalanced' if aligned is not None else 'Unknown'}""")
+        
+        # Movement and emotion
+        sections.append(f"""
+[MOVEMENT] MOVEMENT & DYNAMICS:
+{_DIV}
+  Energy Level    : {movement['energy']}
+  Movement Score  : {movement['movement_score']:8.2f}
+  Velocity        : {movement['velocity']:6.2f} px/frame
+  Sentiment       : {movement['sentiment']}
+
+[EMOTION] FACIAL EMOTION & SENTIMENT:
+{_DIV}
+  Dominant        : {emotion['emotion']}
+  Sentiment       : {emotion['sentiment']}
+  Confidence      : {emotion['confidence']}%""")
         if emotion['details']:
-            output.append(f"  Distribution    : {emotion['details']}")
+            sections.append(f"  Distribution    : {emotion['details']}")
         
         # Activities
-        output.append(f"\n[ACTIVITY] DETECTED ACTIVITIES:")
-        output.append("-" * 80)
-        output.append(f"  {' | '.join(activities)}")
-        
-        output.append(f"{'='*80}\n")
-        
-        # Log all lines
-        for line in output:
-            self.log(line)
+        sections.append(f"""
+[ACTIVITY] DETECTED ACTIVITIES:
+{_DIV}
+  {' | '.join(activities)}
+{_BANNER}
+""")
+        
+        # Log the whole frame as one write
+        self.log('\n'.join(sections))
     
-    def close(self):
+    def close(self) -> None:
         """Close the log file"""
-        if self.log_file and not self.log_file.closed:
+        if self._fd is not None:
             footer = f"""
-{'='*80}
+{_BANNER}
 Session Ended: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-{'='*80}
+{_BANNER}
 """
-            self.log_file.write(footer)
-            self.log_file.close()
+            self._queue.put(footer)
+            self._queue.put(None)
+            self._writer_thread.join()
+            os.close(self._fd)
+            self._fd = None
             print(f"[LOG] Log saved to: {self.log_path}")
     
-    def __del__(self):
+    def __del__(self) -> None:
         """Ensure log file is closed when object is destroyed"""
         self.close()
@@ -0,0 +1,94 @@
+"""
+Pose Batcher Module
+Batches concurrent pose detection requests into shared forward passes
+"""
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PoseBatcher:
+    """
+    Asynchronous batching in front of a PoseDetector
+    
+    Connections await detect() as usual; a single background task collects
+    whatever frames arrive within a short window (up to max_batch), runs one
+    forward pass over all of them and resolves each caller's future with its
+    own result. With many concurrent sessions the network runs at batch B
+    instead of B separate batch-1 passes.
+    """
+    
+    def __init__(self, detector, max_batch=8, max_wait_ms=10.0):
+        """
+        Args:
+            detector: PoseDetector providing detect_batch()
+            max_batch: Largest number of frames per forward pass
+            max_wait_ms: How long to wait for more frames after the first
+        """
+        self.detector = detector
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = asyncio.Queue()
+        self._task = None
+    
+    def start(self):
+        """Start the batching task"""
+        self._task = asyncio.create_task(self._run())
+    
+    async def close(self):
+        """Stop the batching task"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+    async def detect(self, frame):
+        """Detect pose in a frame; returns (points, points_prob) like PoseDetector.detect"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((frame, future))
+        return await future
+    
+    async def _collect(self):
+        """Wait for one request, then gather more until the batch is full or the window closes"""
+        loop = asyncio.get_running_loop()
+        items = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        
+        while len(items) < self.max_batch:
+            if not self._queue.empty():
+                items.append(self._queue.get_nowait())
+                continue
+            
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        # Callers that gave up (e.g. a closed connection) don't need inference
+        return [(frame, future) for frame, future in items if not future.done()]
+    
+    async def _run(self):
+        while True:
+            items = await self._collect()
+            if not items:
+                continue
+            
+            frames = [frame for frame, _ in items]
+            try:
+                results = await asyncio.to_thread(self.detector.detect_batch, frames)
+            except Exception as e:
+                logger.error(f"❌ Batched pose detection failed: {e}", exc_info=True)
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            logger.debug(f"🧍 Pose batch of {len(frames)} frames")
+            for (_, future), result in zip(items, results):
+                if not future.done():
+                    future.set_result(result)
@@ -3,17 +3,94 @@ Posture Analysis Module
 Analyzes body posture, movement, and activities from pose keypoints
 """
 
+import math
+from enum import IntEnum
+
 import cv2
 import numpy as np
 from src.core.emotion_detector import SimpleEmotionDetector
+from src.core.jit import njit, HAS_NUMBA
+
+
+class EnergyLevel(IntEnum):
+    """Movement energy band, sent alongside the display label as 'energy_level'"""
+    UNKNOWN = -1
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+    VERY_HIGH = 3
+
+
+class EmotionCode(IntEnum):
+    """Dominant facial emotion, sent alongside the display label as 'code'"""
+    UNKNOWN = 0
+    NO_FACE = 1
+    NEUTRAL = 2
+    HAPPY = 3
+    SAD = 4
+    ANGRY = 5
+    SURPRISED = 6
+    FEARFUL = 7
+    DISGUSTED = 8
+
+
+# Detector emotion name -> (display label, sentiment, color, code)
+EMOTION_MAP = {
+    'happy': ('Happy/Joyful', 'Positive', (0, 255, 0), EmotionCode.HAPPY),
+    'sad': ('Sad/Down', 'Negative', (255, 0, 100), EmotionCode.SAD),
+    'angry': ('Angry/Frustrated', 'Negative', (0, 0, 255), EmotionCode.ANGRY),
+    'surprise': ('Surprised/Shocked', 'Neutral', (0, 255, 255), EmotionCode.SURPRISED),
+    'surprised': ('Surprised/Shocked', 'Neutral', (0, 255, 255), EmotionCode.SURPRISED),
+    'fear': ('Fearful/Scared', 'Negative', (128, 0, 128), EmotionCode.FEARFUL),
+    'fearful': ('Fearful/Scared', 'Negative', (128, 0, 128), EmotionCode.FEARFUL),
+    'disgust': ('Disgusted', 'Negative', (0, 128, 128), EmotionCode.DISGUSTED),
+    'disgusted': ('Disgusted', 'Negative', (0, 128, 128), EmotionCode.DISGUSTED),
+    'neutral': ('Neutral/Calm', 'Neutral', (200, 200, 200), EmotionCode.NEUTRAL)
+}
+
+
+@njit(cache=True, fastmath=True)
+def _spine_angle(packed):
+    """Angle of the neck -> mid-hip line from vertical, in degrees"""
+    mid_x = (float(packed[8, 0]) + float(packed[11, 0])) / 2
+    mid_y = (float(packed[8, 1]) + float(packed[11, 1])) / 2
+    return math.degrees(math.atan2(float(packed[1, 0]) - mid_x, -(float(packed[1, 1]) - mid_y)))
+
+
+@njit(cache=True, fastmath=True)
+def _movement_stats(history, count, last, prev):
+    """
+    Velocity between two history rows and the summed x/y variance of the
+    first count rows
+    """
+    velocity = math.hypot(history[last, 0] - history[prev, 0], history[last, 1] - history[prev, 1])
+    
+    mean_x = 0.0
+    mean_y = 0.0
+    for i in range(count):
+        mean_x += history[i, 0]
+        mean_y += history[i, 1]
+    mean_x /= count
+    mean_y /= count
+    
+    variance = 0.0
+    for i in range(count):
+        dx = history[i, 0] - mean_x
+        dy = history[i, 1] - mean_y
+        variance += dx * dx + dy * dy
+    
+    return velocity, variance / count
 
 
 class PostureAnalyzer:
     def __init__(self):
-        self.movement_history = []
-        self.pos_history = []  # For velocity calculation
         self.max_history = 30
         
+        # Ring buffer of recent neck positions for movement analysis
+        self.movement_history = np.zeros((self.max_history, 2))
+        self._history_count = 0
+        self._history_head = 0  # Row the next position is written to
+        
         # Initialize emotion detector
         print("Loading emotion detection AI model...")
         try:
@@ -22,22 +99,13 @@ class PostureAnalyzer:
             print(f"⚠ Emotion detection failed: {e}")
             self.emotion_detector = None
         
-    def analyze_posture(self, points):
-        """Analyze posture from keypoints"""
-        if not points[1] or not points[8] or not points[11]:  # Neck, RHip, LHip
+    def analyze_posture(self, P):
+        """Analyze posture from the packed (N, 3) keypoint array"""
+        if P[1, 0] != P[1, 0] or P[8, 0] != P[8, 0] or P[11, 0] != P[11, 0]:  # Neck, RHip, LHip missing (NaN)
             return None
         
-        neck = np.array(points[1][:2])
-        r_hip = np.array(points[8][:2])
-        l_hip = np.array(points[11][:2])
-        
-        # Calculate spine angle (neck to mid-hips)
-        mid_hip = (r_hip + l_hip) / 2
-        spine_vector = neck - mid_hip
-        vertical = np.array([0, -1])  # Up direction
-        
-        # Angle from vertical
-        angle = np.degrees(np.arctan2(spine_vector[0], -spine_vector[1]))
+        # Spine angle from vertical (neck to mid-hips)
+        angle = _spine_angle(P)
         
         # Posture classification
         if abs(angle) < 15:
@@ -54,10 +122,8 @@ class PostureAnalyzer:
             color = (0, 0, 255)
         
         # Check shoulder alignment
-        if points[2] and points[5]:  # RShoulder, LShoulder
-            r_shoulder = np.array(points[2][:2])
-            l_shoulder = np.array(points[5][:2])
-            shoulder_diff = abs(r_shoulder[1] - l_shoulder[1])
+        if P[2, 0] == P[2, 0] and P[5, 0] == P[5, 0]:  # RShoulder, LShoulder
+            shoulder_diff = abs(float(P[2, 1]) - float(P[5, 1]))
             shoulder_aligned = shoulder_diff < 20
         else:
             shoulder_aligned = None
@@ -69,72 +135,73 @@ class PostureAnalyzer:
             'shoulder_aligned': shoulder_aligned
         }
     
-    def analyze_movement(self, points):
-        """Analyze movement energy and velocity from keypoint variance"""
-        if not points[1]:
-            return {'energy': 'Initializing', 'sentiment': 'N/A', 'movement_score': 0, 'velocity': 0, 'color': (100, 100, 100)}
-        
-        # Get neck position (relatively stable reference point)
-        neck_pos = np.array(points[1][:2])
+    def analyze_movement(self, P):
+        """Analyze movement energy and velocity from neck position variance (packed (N, 3) keypoint array)"""
+        if P[1, 0] != P[1, 0]:  # Neck missing (NaN)
+            return {'energy': 'Initializing', 'energy_level': EnergyLevel.UNKNOWN, 'sentiment': 'N/A',
+                    'movement_score': 0, 'velocity': 0, 'color': (100, 100, 100)}
         
-        # Add to history
-        self.movement_history.append(neck_pos)
-        if len(self.movement_history) > self.max_history:
-            self.movement_history.pop(0)
+        # Add neck position (relatively stable reference point) to history
+        last = self._history_head
+        self.movement_history[last] = P[1, :2]
+        self._history_head = (last + 1) % self.max_history
+        self._history_count = min(self._history_count + 1, self.max_history)
         
-        # Calculate velocity
-        velocity = 0
-        if len(self.movement_history) >= 2:
-            velocity = np.linalg.norm(self.movement_history[-1] - self.movement_history[-2])
+        if self._history_count < 2:
+            return {'energy': 'Initializing', 'energy_level': EnergyLevel.UNKNOWN, 'sentiment': 'N/A',
+                    'movement_score': 0, 'velocity': 0, 'color': (100, 100, 100)}
         
-        if len(self.movement_history) < 2:
-            return {'energy': 'Initializing', 'sentiment': 'N/A', 'movement_score': 0, 'velocity': velocity, 'color': (100, 100, 100)}
-        
-        # Calculate movement variance
-        positions = np.array(self.movement_history)
-        movement = np.var(positions, axis=0).sum()
+        # Velocity since the previous position, and movement variance
+        prev = (last - 1) % self.max_history
+        velocity, movement = _movement_stats(self.movement_history, self._history_count, last, prev)
         
         if movement < 5:
             energy = "Low (Calm/Still)"
+            energy_level = EnergyLevel.LOW
             sentiment = "Relaxed/Focused"
             color = (255, 200, 100)
         elif movement < 20:
             energy = "Medium (Active)"
+            energy_level = EnergyLevel.MEDIUM
             sentiment = "Engaged/Working"
             color = (100, 255, 100)
         elif movement < 50:
             energy = "High (Moving)"
+            energy_level = EnergyLevel.HIGH
             sentiment = "Energetic/Excited"
             color = (0, 200, 255)
         else:
             energy = "Very High (Dynamic)"
+            energy_level = EnergyLevel.VERY_HIGH
             sentiment = "Very Active/Restless"
             color = (0, 100, 255)
         
         return {
             'energy': energy,
+            'energy_level': energy_level,
             'sentiment': sentiment,
             'movement_score': movement,
             'velocity': velocity,
             'color': color
         }
     
-    def detect_activity(self, points):
-        """Detect specific activities"""
+    def detect_activity(self, P):
+        """Detect specific activities from the packed (N, 3) keypoint array"""
         activities = []
+        valid = P[:, 0] == P[:, 0]  # NaN rows are missing points
         
         # Check if hands raised (celebrating, waving)
-        if points[4] and points[1]:  # RWrist, Neck
-            if points[4][1] < points[1][1]:
+        if valid[4] and valid[1]:  # RWrist, Neck
+            if P[4, 1] < P[1, 1]:
                 activities.append("Right Hand Raised")
         
-        if points[7] and points[1]:  # LWrist, Neck
-            if points[7][1] < points[1][1]:
+        if valid[7] and valid[1]:  # LWrist, Neck
+            if P[7, 1] < P[1, 1]:
                 activities.append("Left Hand Raised")
         
         # Check if sitting/standing
-        if points[8] and points[10]:  # RHip, RAnkle
-            hip_ankle_dist = abs(points[8][1] - points[10][1])
+        if valid[8] and valid[10]:  # RHip, RAnkle
+            hip_ankle_dist = abs(P[8, 1] - P[10, 1])
             if hip_ankle_dist < 150:
                 activities.append("Sitting")
             else:
@@ -147,6 +214,7 @@ class PostureAnalyzer:
         if self.emotion_detector is None:
             return {
                 'emotion': 'N/A',
+                'code': EmotionCode.UNKNOWN,
                 'confidence': 0,
                 'details': '',
                 'color': (200, 200, 200),
@@ -160,6 +228,7 @@ class PostureAnalyzer:
             if result is None:
                 return {
                     'emotion': 'No Face',
+                    'code': EmotionCode.NO_FACE,
                     'confidence': 0,
                     'details': 'No face in frame',
                     'color': (100, 100, 100),
@@ -171,21 +240,9 @@ class PostureAnalyzer:
             confidence = result['confidence']
             emotions = result['emotions']
             
-            # Map to sentiment and color
-            emotion_map = {
-                'happy': ('Happy/Joyful', 'Positive', (0, 255, 0)),
-                'sad': ('Sad/Down', 'Negative', (255, 0, 100)),
-                'angry': ('Angry/Frustrated', 'Negative', (0, 0, 255)),
-                'surprise': ('Surprised/Shocked', 'Neutral', (0, 255, 255)),
-                'surprised': ('Surprised/Shocked', 'Neutral', (0, 255, 255)),
-                'fear': ('Fearful/Scared', 'Negative', (128, 0, 128)),
-                'fearful': ('Fearful/Scared', 'Negative', (128, 0, 128)),
-                'disgust': ('Disgusted', 'Negative', (0, 128, 128)),
-                'disgusted': ('Disgusted', 'Negative', (0, 128, 128)),
-                'neutral': ('Neutral/Calm', 'Neutral', (200, 200, 200))
-            }
-            
-            display, sentiment, color = emotion_map.get(emotion_name.lower(), (emotion_name, 'Unknown', (150, 150, 150)))
+            # Map to sentiment, color and code
+            display, sentiment, color, code = EMOTION_MAP.get(
+                emotion_name.lower(), (emotion_name, 'Unknown', (150, 150, 150), EmotionCode.UNKNOWN))
             
             # Draw face box
             x, y, w, h = result['face_region']
@@ -207,6 +264,7 @@ class PostureAnalyzer:
             
             return {
                 'emotion': display,
+                'code': code,
                 'sentiment': sentiment,
                 'confidence': int(confidence),
                 'details': details,
@@ -217,9 +275,16 @@ class PostureAnalyzer:
         except Exception as e:
             return {
                 'emotion': 'Error',
+                'code': EmotionCode.UNKNOWN,
                 'confidence': 0,
                 'details': str(e)[:30],
                 'color': (100, 100, 100),
                 'sentiment': 'Unknown',
                 'all_emotions': {}
             }
+
+
+# Compile the kernels at import so the first frame doesn't pay the JIT cost
+if HAS_NUMBA:
+    _spine_angle(np.zeros((18, 3), dtype=np.float32))
+    _movement_stats(np.zeros((2, 2)), 2, 1, 0)
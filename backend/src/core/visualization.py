@@ -7,10 +7,10 @@ import cv2
 
 
 def draw_skeleton(frame, points, pose_pairs):
-    """Draw skeleton on frame"""
+    """Draw skeleton on frame from the packed (N, 3) keypoint array"""
     for pair in pose_pairs:
         pt_A, pt_B = points[pair[0]], points[pair[1]]
-        if pt_A is not None and pt_B is not None:
+        if pt_A[0] == pt_A[0] and pt_B[0] == pt_B[0]:  # NaN rows are missing points
             cv2.line(frame, (int(pt_A[0]), int(pt_A[1])), 
                     (int(pt_B[0]), int(pt_B[1])), (0, 255, 0), 3)
             cv2.circle(frame, (int(pt_A[0]), int(pt_A[1])), 5, (0, 0, 255), -1)
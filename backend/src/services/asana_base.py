@@ -3,10 +3,169 @@ Asana Base Class
 Defines the contract for all yoga pose definitions
 """
 
-from typing import Dict, List, Tuple, Optional
+import math
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+
+from src.core.jit import njit, HAS_NUMBA
+
+
+# OpenPose COCO keypoint indices into the packed (18, 3) keypoint array
+NOSE, NECK = 0, 1
+R_SHOULDER, R_ELBOW, R_WRIST = 2, 3, 4
+L_SHOULDER, L_ELBOW, L_WRIST = 5, 6, 7
+R_HIP, R_KNEE, R_ANKLE = 8, 9, 10
+L_HIP, L_KNEE, L_ANKLE = 11, 12, 13
+
+
+# Keypoints OpenPose scored below this are treated as missing by every check
+MIN_KEYPOINT_CONFIDENCE = 0.3
+
+# Bit i of a presence mask is keypoint i
+_JOINT_BITS = np.left_shift(np.uint32(1), np.arange(18, dtype=np.uint32))
+
+
+def joint_mask(*joints: int) -> int:
+    """Presence bitmask with the given keypoint indices set"""
+    mask = 0
+    for joint in joints:
+        mask |= 1 << joint
+    return mask
+
+
+def presence_mask(keypoints: np.ndarray, min_confidence: float = MIN_KEYPOINT_CONFIDENCE) -> np.ndarray:
+    """
+    Bitmask of usable keypoints, computed once per frame for all checks
+    
+    A keypoint counts as present when it was detected with confidence above
+    min_confidence; low-confidence peaks are mostly noise and would otherwise
+    drive the geometry.
+    
+    Args:
+        keypoints: Packed (..., 18, 3) keypoint array, NaN rows for missing points
+        min_confidence: Confidence gate
+        
+    Returns:
+        uint32 mask per frame; a check needing joints `req` (from joint_mask)
+        can run where ``present & req == req``
+    """
+    confident = keypoints[..., 2] > min_confidence  # False for NaN rows too
+    return np.where(confident, _JOINT_BITS, np.uint32(0)).sum(axis=-1, dtype=np.uint32)
+
+
+def run_check_kernel(kernel, keypoints: np.ndarray, valid: np.ndarray, *args) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run a compiled alignment kernel over one frame or a batch of frames
+    
+    Args:
+        kernel: One of the *_scores kernels below
+        keypoints: Packed (..., 18, 3) keypoint array
+        valid: Bool array over the frame axes; invalid frames count as aligned
+        args: The kernel's joint indices / thresholds
+        
+    Returns:
+        (is_aligned, severity) arrays shaped like valid
+    """
+    frames = keypoints.shape[:-2]
+    aligned, severity = kernel(keypoints.reshape(-1, 18, 3), np.reshape(valid, -1), *args)
+    return aligned.reshape(frames), severity.reshape(frames)
+
+
+# Scalar alignment tests shared by the per-frame kernels below and by
+# asana-specific kernels that score several rules in one frame loop.
+
+@njit(cache=True, fastmath=True)
+def spine_vertical(spine_x, spine_up, tan_threshold, severity_scale):
+    """
+    Lean of a spine vector (neck relative to mid-hip, y up) from vertical
+    
+    The threshold is passed as tan(threshold angle): for an upward spine,
+    leaning more than that angle means |dx| > tan(angle) * up, so aligned
+    frames need no trig. The angle in degrees is only computed for the
+    severity of frames that fail.
+    
+    Returns:
+        (is_aligned, severity)
+    """
+    # A downward or horizontal spine (up <= 0) fails unless it is a point
+    if abs(spine_x) > tan_threshold * spine_up:
+        return False, min(abs(math.degrees(math.atan2(spine_x, spine_up))) / severity_scale, 1.0)
+    return True, 0.0
+
+
+@njit(cache=True, fastmath=True)
+def offset_check(offset, distance, ratio, severity_ratio):
+    """
+    Offset allowed up to ratio * distance (height difference across a
+    width, horizontal offset along a height)
+    
+    Returns:
+        (is_aligned, severity)
+    """
+    # Under 10 px apart probably not in pose
+    if distance >= 10 and offset > distance * ratio:
+        return False, min(offset / (distance * severity_ratio), 1.0)
+    return True, 0.0
+
+
+# Per-frame alignment kernels. Each takes an (N, 18, 3) keypoint array and an
+# (N,) mask of frames whose required joints are present (computed by the
+# caller: fastmath lets the compiler assume values are never NaN), and
+# returns (is_aligned, severity) arrays.
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def spine_vertical_scores(kp, valid, tan_threshold, severity_scale):
+    """Lean of the neck -> mid-hip line from vertical (see spine_vertical)"""
+    n = kp.shape[0]
+    aligned = np.ones(n, dtype=np.bool_)
+    severity = np.zeros(n)
+    for i in range(n):
+        if valid[i]:
+            spine_x = kp[i, NECK, 0] - 0.5 * (kp[i, R_HIP, 0] + kp[i, L_HIP, 0])
+            spine_up = 0.5 * (kp[i, R_HIP, 1] + kp[i, L_HIP, 1]) - kp[i, NECK, 1]
+            aligned[i], severity[i] = spine_vertical(spine_x, spine_up, tan_threshold, severity_scale)
+    return aligned, severity
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def level_scores(kp, valid, a, b, ratio, severity_ratio):
+    """Height difference of keypoints a and b relative to their horizontal spread"""
+    n = kp.shape[0]
+    aligned = np.ones(n, dtype=np.bool_)
+    severity = np.zeros(n)
+    for i in range(n):
+        if valid[i]:
+            aligned[i], severity[i] = offset_check(abs(kp[i, a, 1] - kp[i, b, 1]), abs(kp[i, a, 0] - kp[i, b, 0]),
+                                                   ratio, severity_ratio)
+    return aligned, severity
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def stacked_scores(kp, valid, top, bottom, ratio, severity_ratio):
+    """Horizontal offset of keypoint top from bottom relative to their vertical distance"""
+    n = kp.shape[0]
+    aligned = np.ones(n, dtype=np.bool_)
+    severity = np.zeros(n)
+    for i in range(n):
+        if valid[i]:
+            aligned[i], severity[i] = offset_check(abs(kp[i, top, 0] - kp[i, bottom, 0]), abs(kp[i, top, 1] - kp[i, bottom, 1]),
+                                                   ratio, severity_ratio)
+    return aligned, severity
+
+
+# Compile the kernels at import so the first frame doesn't pay the JIT cost
+if HAS_NUMBA:
+    _kp = np.zeros((1, 18, 3), dtype=np.float32)
+    _valid = np.ones(1, dtype=np.bool_)
+    spine_vertical_scores(_kp, _valid, math.tan(math.radians(10.0)), 30.0)
+    level_scores(_kp, _valid, R_HIP, L_HIP, 0.05, 0.15)
+    stacked_scores(_kp, _valid, R_ANKLE, R_KNEE, 0.15, 0.3)
+    del _kp, _valid
+
 
 class JointPriority(Enum):
     """Priority levels for joint alignment checks"""
@@ -68,15 +227,22 @@ class AsanaBase:
     - Joint angle constraints
     - Alignment rules
     - Common errors
+    
+    as class attributes when they are fixed, or in __init__ when they
+    depend on constructor arguments.
     """
     
+    name: str = ""
+    sanskrit_name: str = ""
+    required_joints: List[str] = []
+    angle_constraints: Dict[str, JointAngleConstraint] = {}
+    alignment_rules: Sequence[AlignmentRule] = ()
+    common_errors: Dict[str, str] = {}
+    
     def __init__(self):
-        self.name: str = ""
-        self.sanskrit_name: str = ""
-        self.required_joints: List[str] = []
-        self.angle_constraints: Dict[str, JointAngleConstraint] = {}
-        self.alignment_rules: List[AlignmentRule] = []
-        self.common_errors: Dict[str, str] = {}
+        # Per-thread single-frame result buffers for evaluate_alignment
+        # (registry instances are shared between connections)
+        self._local = threading.local()
     
     def validate_pose(self, joint_angles: Dict[str, float]) -> Tuple[bool, List[str]]:
         """
@@ -95,14 +261,67 @@ class AsanaBase:
         
         return len(missing) == 0, missing
     
+    def alignment_scores(self, keypoints: np.ndarray,
+                         out: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run every alignment rule over one frame or a batch of frames
+        
+        Each check method takes the packed keypoints with any number of
+        leading frame axes plus their presence_mask(), and returns
+        (is_aligned, severity) arrays over the frame axes, so a whole clip is
+        scored in one vectorized pass per rule.
+        
+        Args:
+            keypoints: Packed (18, 3) keypoint array, or (N, 18, 3) for N frames
+            out: Optional (bool, float64) arrays of the result shape to fill
+                instead of allocating new ones
+            
+        Returns:
+            (aligned, severity) - arrays of shape (rules,) or (N, rules)
+        """
+        if out is None:
+            shape = keypoints.shape[:-2] + (len(self.alignment_rules),)
+            out = np.empty(shape, dtype=bool), np.empty(shape)
+        aligned, severity = out
+        present = presence_mask(keypoints)
+        
+        for i, check_method in enumerate(self._check_methods()):
+            if check_method is not None:
+                aligned[..., i], severity[..., i] = check_method(keypoints, present)
+            else:
+                aligned[..., i], severity[..., i] = True, 0.0
+        
+        return aligned, severity
+    
+    def _check_methods(self) -> Tuple[Optional[Callable], ...]:
+        """
+        Bound check method of each alignment rule (None if undefined),
+        looked up once instead of by name on every frame
+        """
+        checks = self.__dict__.get('_checks')
+        if checks is None:
+            checks = self._checks = tuple(getattr(self, rule.check_function, None)
+                                          for rule in self.alignment_rules)
+        return checks
+    
+    def _frame_scores(self) -> Tuple[np.ndarray, np.ndarray]:
+        """This thread's reusable single-frame (aligned, severity) buffers"""
+        local = self._local
+        scores = getattr(local, "scores", None)
+        if scores is None:
+            n = len(self.alignment_rules)
+            scores = local.scores = (np.empty(n, dtype=bool), np.empty(n))
+        return scores
+    
     def evaluate_alignment(self, joint_angles: Dict[str, float], 
-                          keypoints: Dict[str, Tuple[float, float, float]]) -> List[Dict]:
+                          keypoints: np.ndarray) -> List[Dict]:
         """
         Evaluate pose alignment and detect errors
         
         Args:
             joint_angles: Dictionary of joint angles
-            keypoints: Dictionary of keypoint positions (x, y, confidence)
+            keypoints: Packed (18, 3) keypoint array (x, y, confidence), NaN
+                rows for missing points
             
         Returns:
             List of detected errors with severity scores
@@ -133,21 +352,17 @@ class AsanaBase:
                         'message': self.common_errors.get(error_code, f"{joint_name} alignment issue")
                     })
         
-        # Check alignment rules
-        for rule in self.alignment_rules:
-            # Call the specific alignment check method
-            if hasattr(self, rule.check_function):
-                check_method = getattr(self, rule.check_function)
-                is_aligned, severity = check_method(keypoints)
-                
-                if not is_aligned:
-                    errors.append({
-                        'error_code': rule.rule_id,
-                        'joint': 'alignment',
-                        'severity': severity,
-                        'priority': rule.priority.value,
-                        'message': rule.error_message
-                    })
+        # Check alignment rules (values are copied out by tolist() below)
+        aligned, severity = self.alignment_scores(keypoints, out=self._frame_scores())
+        for rule, is_aligned, rule_severity in zip(self.alignment_rules, aligned.tolist(), severity.tolist()):
+            if not is_aligned:
+                errors.append({
+                    'error_code': rule.rule_id,
+                    'joint': 'alignment',
+                    'severity': rule_severity,
+                    'priority': rule.priority.value,
+                    'message': rule.error_message
+                })
         
         # Sort by priority (critical first) then severity
         errors.sort(key=lambda e: (e['priority'], -e['severity']))
@@ -155,7 +370,7 @@ class AsanaBase:
         return errors
     
     def get_top_error(self, joint_angles: Dict[str, float],
-                     keypoints: Dict[str, Tuple[float, float, float]]) -> Optional[Dict]:
+                     keypoints: np.ndarray) -> Optional[Dict]:
         """
         Get the single most important error to correct
         
@@ -6,13 +6,32 @@ Detects yoga asanas from body keypoints and joint angles using rule-based classi
 import logging
 import time
 from typing import Dict, List, Tuple, Any, Optional
+
+import numpy as np
+
 from src.config.asana_definitions import (
     ASANA_DEFINITIONS,
-    get_asana_names,
+    DETECTION_ASANAS,
+    DETECTION_COUNTS,
+    DETECTION_OFFSETS,
+    DETECTION_TABLE,
+    F_ALWAYS,
+    F_ANKLE_SPREAD,
+    F_BALANCE,
+    F_ELBOW_MIN,
+    F_HIP_BELOW_NECK,
+    F_HIP_TILT,
+    F_KNEE_MAX,
+    F_KNEE_MIN,
+    F_POSTURE_ANGLE,
+    F_SHOULDER_MAX,
+    NUM_FEATURES,
+    evaluate_rules,
     get_ideal_alignment,
     get_common_mistakes,
     get_key_corrections
 )
+from src.services.asana_base import NECK, R_HIP, R_ANKLE, L_HIP, L_ANKLE
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +48,7 @@ class AsanaDetector:
         
     def detect_asana(
         self,
-        keypoints: Dict[str, Dict[str, float]],
+        keypoints: Optional[np.ndarray],
         joints: Dict[str, float],
         balance: Dict[str, Any],
         posture: Dict[str, Any]
@@ -38,7 +57,8 @@ class AsanaDetector:
         Detect which asana the user is performing
         
         Args:
-            keypoints: Dictionary of keypoint positions {point_name: {x, y, confidence}}
+            keypoints: Packed (18, 3) keypoint array, NaN rows for missing
+                points (None if unavailable)
             joints: Dictionary of joint angles {joint_name: angle}
             balance: Balance analysis data
             posture: Posture analysis data
@@ -46,48 +66,25 @@ class AsanaDetector:
         Returns:
             (asana_name, confidence_score) or (None, 0) if no match
         """
-        logger.debug(f"[ASANA_DETECTOR] Detecting asana from {len(keypoints)} keypoints and {len(joints)} joints")
-        
-        # Score each asana based on detection rules
-        asana_scores = {}
-        
-        for asana_name in get_asana_names():
-            asana_def = ASANA_DEFINITIONS[asana_name]
-            detection_rules = asana_def.get('detection_rules', {})
-            
-            # Evaluate each rule
-            rules_passed = 0
-            total_rules = len(detection_rules)
-            
-            for rule_name, rule_func in detection_rules.items():
-                try:
-                    # Pass appropriate data to each rule
-                    if 'joints' in rule_name or rule_name in ['legs_straight', 'front_knee_bent', 'back_leg_straight', 'arms_raised', 'arms_extended']:
-                        result = rule_func(joints)
-                    elif 'keypoints' in rule_name or 'feet' in rule_name or 'stance' in rule_name or 'hips' in rule_name:
-                        result = rule_func(keypoints)
-                    elif 'balance' in rule_name:
-                        result = rule_func(balance)
-                    elif 'posture' in rule_name or 'upright' in rule_name or 'inverted' in rule_name:
-                        result = rule_func(posture)
-                    else:
-                        result = rule_func(keypoints)  # Default to keypoints
-                    
-                    if result:
-                        rules_passed += 1
-                        logger.debug(f"[ASANA_DETECTOR] {asana_name}.{rule_name}: PASS")
-                    else:
-                        logger.debug(f"[ASANA_DETECTOR] {asana_name}.{rule_name}: FAIL")
-                        
-                except Exception as e:
-                    logger.warning(f"[ASANA_DETECTOR] Error evaluating rule {rule_name} for {asana_name}: {e}")
-                    continue
-            
-            # Calculate confidence score (percentage of rules passed)
-            if total_rules > 0:
-                confidence = rules_passed / total_rules
-                asana_scores[asana_name] = confidence
-                logger.debug(f"[ASANA_DETECTOR] {asana_name}: {rules_passed}/{total_rules} rules passed = {confidence:.2f} confidence")
+        if logger.isEnabledFor(logging.DEBUG):
+            n_keypoints = 0 if keypoints is None else int(np.count_nonzero(~np.isnan(keypoints[:, 0])))
+            logger.debug(f"[ASANA_DETECTOR] Detecting asana from {n_keypoints} keypoints and {len(joints)} joints")
+        
+        # Score every asana's rules at once against one feature vector
+        features = self.detection_features(keypoints, joints, balance, posture)
+        passed = evaluate_rules(DETECTION_TABLE, features)
+        rules_passed = np.add.reduceat(passed, DETECTION_OFFSETS)
+        confidences = rules_passed / DETECTION_COUNTS
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, asana_name in enumerate(DETECTION_ASANAS):
+                n_passed, total_rules, confidence = rules_passed[i], DETECTION_COUNTS[i], confidences[i]
+                start = DETECTION_OFFSETS[i]
+                for rule, ok in zip(DETECTION_TABLE[start:start + total_rules], passed[start:start + total_rules]):
+                    logger.debug(f"[ASANA_DETECTOR] {asana_name}.{rule['name']}: {'PASS' if ok else 'FAIL'}")
+                logger.debug(f"[ASANA_DETECTOR] {asana_name}: {n_passed}/{total_rules} rules passed = {confidence:.2f} confidence")
+        
+        asana_scores = dict(zip(DETECTION_ASANAS, confidences.tolist()))
         
         # Find best match
         if not asana_scores:
@@ -111,6 +108,37 @@ class AsanaDetector:
         
         return best_asana, best_confidence
     
+    @staticmethod
+    def detection_features(
+        keypoints: Optional[np.ndarray],
+        joints: Dict[str, float],
+        balance: Dict[str, Any],
+        posture: Dict[str, Any]
+    ) -> np.ndarray:
+        """Gather the frame features the detection rules test (see asana_definitions)"""
+        def coord(joint: int, axis: int, default: float = 0.0) -> float:
+            if keypoints is None:
+                return default
+            value = float(keypoints[joint, axis])
+            return default if value != value else value  # NaN rows are missing points
+        
+        r_knee, l_knee = joints.get('RKnee', 0), joints.get('LKnee', 0)
+        
+        features = np.empty(NUM_FEATURES)
+        features[F_KNEE_MAX] = max(r_knee, l_knee)
+        features[F_KNEE_MIN] = min(r_knee, l_knee)
+        features[F_SHOULDER_MAX] = max(joints.get('RShoulder', 0), joints.get('LShoulder', 0))
+        features[F_ELBOW_MIN] = min(joints.get('RElbow', 0), joints.get('LElbow', 0))
+        features[F_HIP_TILT] = abs(coord(R_HIP, 1) - coord(L_HIP, 1))
+        features[F_ANKLE_SPREAD] = abs(coord(R_ANKLE, 0) - coord(L_ANKLE, 0))
+        # Missing hips sit low (y=500) so an absent pose never looks inverted
+        features[F_HIP_BELOW_NECK] = coord(R_HIP, 1, 500.0) - coord(NECK, 1)
+        features[F_BALANCE] = balance.get('balance_score', 0)
+        # No posture angle fails both the upright and inverted checks
+        features[F_POSTURE_ANGLE] = posture.get('angle', np.nan)
+        features[F_ALWAYS] = 1.0
+        return features
+    
     def _update_pose_tracking(self, asana_name: str, confidence: float):
         """Update internal pose tracking state"""
         current_time = time.time()
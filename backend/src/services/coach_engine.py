@@ -4,8 +4,15 @@ Core coaching intelligence and decision making
 FIXED: Enhanced logging for debugging
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Tuple
+import time
+from typing import Dict, Any, Awaitable, Callable, Optional, Tuple
+
+import numpy as np
+
+from src.core.posture_analyzer import EnergyLevel, EmotionCode
+from src.services.asana_base import MIN_KEYPOINT_CONFIDENCE
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +26,11 @@ class CoachEngine:
     - Maintains coaching cooldowns
     """
     
-    # Cooldown settings (in frames)
-    MIN_FRAMES_BETWEEN_FEEDBACK = 30  # ~1 second at 30fps (reduced for testing)
+    # Cooldown settings (monotonic clock, so it holds at any frame rate)
+    MIN_FEEDBACK_INTERVAL_NS = 1_000_000_000  # 1 second (reduced for testing)
     
     # Confidence thresholds
-    MIN_CONFIDENCE = 0.3
+    MIN_CONFIDENCE = MIN_KEYPOINT_CONFIDENCE
     MIN_EMOTION_CONFIDENCE = 50
     
     # Issue thresholds
@@ -31,56 +38,81 @@ class CoachEngine:
     POOR_POSTURE_ANGLE = 40  # degrees from vertical
     HIGH_ASYMMETRY_THRESHOLD = 20  # percent difference
     
+    # Fixed issue set; _detect_issues reports a bitmask over these ids and
+    # persistence is tracked in one counter per issue
+    ISSUES = ('poor_balance', 'poor_posture', 'asymmetry', 'high_energy',
+              'low_energy', 'movement_detected', 'low_confidence', 'frustration')
+    ISSUE_IDS = {issue: i for i, issue in enumerate(ISSUES)}
+    _ISSUE_BITS = np.left_shift(1, np.arange(len(ISSUES)))
+    
+    # Consecutive frames before an issue counts as persistent
+    PERSISTENCE_FRAMES = 5
+    
+    # Feedback requests waiting for the Gemini worker; more are dropped
+    FEEDBACK_QUEUE_SIZE = 2
+    
+    __slots__ = ('session', 'gemini', '_last_feedback_ns', '_issue_counters',
+                 '_feedback_queue', '_feedback_task', '_on_feedback')
+    
     def __init__(self, session: Any, gemini_client: Any):
         self.session = session
         self.gemini = gemini_client
         
-        self.last_feedback_frame = 0
-        self.consecutive_issues = {}  # Track persistent issues
+        self._last_feedback_ns = 0
+        self._issue_counters = np.zeros(len(self.ISSUES), dtype=np.int16)  # Consecutive frames per issue
+        
+        # Background feedback worker (see start())
+        self._feedback_queue: Optional[asyncio.Queue] = None
+        self._feedback_task: Optional[asyncio.Task] = None
+        self._on_feedback: Optional[Callable[[Dict[str, Any], str, str], Awaitable[None]]] = None
         
         logger.info("🎓 CoachEngine initialized")
         
-    async def should_provide_feedback(self, frame_data: Dict[str, Any]) -> Tuple[bool, str]:
+    def should_provide_feedback(self, frame_data: Dict[str, Any]) -> Tuple[bool, str]:
         """
         Determine if coaching feedback should be provided
         
+        Plain (non-async) method: nothing in here awaits, and most frames
+        fall in the cooldown window and return on the first comparison.
+        
         Args:
             frame_data: Current frame analysis
             
         Returns:
             (should_coach: bool, reason: str)
         """
-        frame_num = frame_data.get("frame_num", 0)
+        # Check cooldown before touching anything else
+        if time.monotonic_ns() - self._last_feedback_ns < self.MIN_FEEDBACK_INTERVAL_NS:
+            return False, ""
         
-        logger.debug(f"🔍 Checking frame {frame_num} for coaching opportunities")
+        logger.debug("🔍 Checking frame %s for coaching opportunities", frame_data.get("frame_num", 0))
         
-        # Check cooldown
-        frames_since_last = frame_num - self.last_feedback_frame
-        if frames_since_last < self.MIN_FRAMES_BETWEEN_FEEDBACK:
-            logger.debug(f"⏰ Cooldown active: {frames_since_last}/{self.MIN_FRAMES_BETWEEN_FEEDBACK} frames since last feedback")
-            return False, ""
+        # Both checks below read the emotion result
+        emotion = frame_data.get("emotion", {})
+        emotion_conf = emotion.get("confidence", 0)
         
         # Check data quality
-        if not self._is_high_quality_data(frame_data):
+        if not self._is_high_quality_data(frame_data, emotion, emotion_conf):
             logger.debug("⚠️ Frame data quality insufficient for coaching")
             return False, ""
         
         logger.debug("✅ Frame data quality is good")
         
         # Detect issues
-        issues = self._detect_issues(frame_data)
+        issues = self._detect_issues(frame_data, emotion, emotion_conf)
         
         if not issues:
             logger.debug("✅ No issues detected in current frame")
             return False, ""
         
-        logger.info(f"⚠️ Issues detected: {issues}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("⚠️ Issues detected: %s", self._issue_names(issues))
         
         # Check if issue is persistent (appeared in multiple consecutive frames)
         persistent_issue = self._check_persistence(issues)
         
         if persistent_issue:
-            logger.info(f"🔔 Persistent issue detected: {persistent_issue}")
+            logger.info("🔔 Persistent issue detected: %s", persistent_issue)
             return True, persistent_issue
         
         logger.debug("ℹ️ Issues detected but not yet persistent")
@@ -98,79 +130,136 @@ class CoachEngine:
             The coaching feedback text
         """
         try:
-            logger.info(f"🤖 Requesting Gemini feedback for: {reason}")
+            logger.info("🤖 Requesting Gemini feedback for: %s", reason)
             
             # Build context for Gemini
             context = self._build_coaching_context(frame_data, reason)
-            logger.debug(f"📋 Context built: {list(context.keys())}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("📋 Context built: %s", list(context))
             
             # Get coaching feedback from Gemini
             feedback = await self.gemini.send_coaching_request(context)
             
-            logger.info(f"💬 Gemini responded: {feedback}")
+            logger.info("💬 Gemini responded: %s", feedback)
             
             # Update session
             self.session.record_feedback(feedback, reason)
-            self.last_feedback_frame = frame_data.get("frame_num", 0)
+            self._last_feedback_ns = time.monotonic_ns()
             
             return feedback
             
         except Exception as e:
-            logger.error(f"❌ Error providing feedback: {e}", exc_info=True)
+            logger.error("❌ Error providing feedback: %s", e, exc_info=True)
             fallback = "Keep up the good work!"
-            logger.warning(f"⚠️ Using fallback feedback: {fallback}")
+            logger.warning("⚠️ Using fallback feedback: %s", fallback)
             return fallback
     
-    def _is_high_quality_data(self, frame_data: Dict[str, Any]) -> bool:
+    def start(self, on_feedback: Callable[[Dict[str, Any], str, str], Awaitable[None]]):
+        """
+        Start the background feedback worker
+        
+        Args:
+            on_feedback: Coroutine function called with (frame_data, reason,
+                feedback) for every completed request
+        """
+        self._on_feedback = on_feedback
+        self._feedback_queue = asyncio.Queue(maxsize=self.FEEDBACK_QUEUE_SIZE)
+        self._feedback_task = asyncio.create_task(self._feedback_worker())
+    
+    async def close(self):
+        """Stop the feedback worker; queued requests are discarded"""
+        if self._feedback_task is not None:
+            self._feedback_task.cancel()
+            await asyncio.gather(self._feedback_task, return_exceptions=True)
+            self._feedback_task = None
+    
+    def queue_feedback(self, frame_data: Dict[str, Any], reason: str) -> bool:
+        """
+        Hand a feedback request to the worker without waiting for Gemini
+        
+        The cooldown restarts now, so the same issue isn't queued again while
+        its request is still waiting.
+        
+        Returns:
+            False if the queue was full and the request was dropped
+        """
+        try:
+            self._feedback_queue.put_nowait((frame_data, reason))
+        except asyncio.QueueFull:
+            logger.debug("⏭️ Dropped feedback for %s (queue full)", reason)
+            return False
+        
+        self._last_feedback_ns = time.monotonic_ns()
+        return True
+    
+    async def _feedback_worker(self):
+        """Run queued feedback requests one at a time"""
+        queue = self._feedback_queue
+        while True:
+            frame_data, reason = await queue.get()
+            feedback = await self.provide_feedback(frame_data, reason)
+            try:
+                await self._on_feedback(frame_data, reason, feedback)
+            except Exception as e:
+                logger.error("❌ Error delivering feedback: %s", e, exc_info=True)
+    
+    def _is_high_quality_data(self, frame_data: Dict[str, Any], emotion: Dict[str, Any],
+                              emotion_conf: float) -> bool:
         """
         Check if frame data is high quality enough for coaching
         
         Args:
             frame_data: Frame analysis
+            emotion: The frame's emotion result
+            emotion_conf: Its confidence (percent)
             
         Returns:
             True if data quality is sufficient
         """
-        # Check if enough keypoints detected
-        keypoints = frame_data.get("keypoints", [])
-        valid_points = sum(1 for p in keypoints if p is not None)
+        # Check if enough confident keypoints detected (NaN rows compare False)
+        keypoints = frame_data.get("keypoints")
+        if keypoints is None:
+            return False
+        valid_points = int(np.count_nonzero(keypoints[:, 2] > self.MIN_CONFIDENCE))
         
         # Lowered threshold to 6 keypoints for partial pose analysis
         if valid_points < 6:
-            logger.debug(f"❌ Only {valid_points} valid keypoints (need 6)")
+            logger.debug("❌ Only %d valid keypoints (need 6)", valid_points)
             return False
         
-        logger.debug(f"✅ {valid_points} valid keypoints detected")
+        logger.debug("✅ %d valid keypoints detected", valid_points)
         
         # Check emotion confidence if emotion-based coaching
-        emotion = frame_data.get("emotion", {})
         if emotion.get("emotion") != "No Face":
-            confidence = emotion.get("confidence", 0)
-            if confidence < self.MIN_EMOTION_CONFIDENCE:
-                logger.debug(f"❌ Emotion confidence too low: {confidence}% (need {self.MIN_EMOTION_CONFIDENCE}%)")
+            if emotion_conf < self.MIN_EMOTION_CONFIDENCE:
+                logger.debug("❌ Emotion confidence too low: %s%% (need %s%%)", emotion_conf, self.MIN_EMOTION_CONFIDENCE)
                 return False
-            logger.debug(f"✅ Emotion confidence: {confidence}%")
+            logger.debug("✅ Emotion confidence: %s%%", emotion_conf)
         
         return True
     
-    def _detect_issues(self, frame_data: Dict[str, Any]) -> list:
+    def _detect_issues(self, frame_data: Dict[str, Any], emotion: Dict[str, Any],
+                       emotion_conf: float) -> int:
         """
         Detect posture/movement/balance issues
         
         Args:
             frame_data: Current analysis
+            emotion: The frame's emotion result
+            emotion_conf: Its confidence (percent)
             
         Returns:
-            List of issue strings
+            Bitmask of detected issues (bit ISSUE_IDS[name])
         """
-        issues = []
+        ids = self.ISSUE_IDS
+        issues = 0
         
         # Balance issues (check if data is available)
         balance = frame_data.get("balance", {})
         balance_score = balance.get("balance_score", 100)
         if balance_score > 0 and balance_score < self.POOR_BALANCE_THRESHOLD:
-            issues.append("poor_balance")
-            logger.debug(f"⚠️ Poor balance detected: {balance_score:.1f}/100")
+            issues |= 1 << ids["poor_balance"]
+            logger.debug("⚠️ Poor balance detected: %.1f/100", balance_score)
         
         # Posture issues (only check if we have posture data)
         posture = frame_data.get("posture", {})
@@ -179,8 +268,8 @@ class CoachEngine:
         
         if posture_status != "Unknown" and posture_status != "Insufficient Data":
             if posture_angle > self.POOR_POSTURE_ANGLE:
-                issues.append("poor_posture")
-                logger.debug(f"⚠️ Poor posture detected: {posture_angle:.1f}° from vertical")
+                issues |= 1 << ids["poor_posture"]
+                logger.debug("⚠️ Poor posture detected: %.1f° from vertical", posture_angle)
         
         # Symmetry issues
         symmetry = frame_data.get("symmetry", {})
@@ -188,84 +277,96 @@ class CoachEngine:
         leg_asym = symmetry.get("leg_symmetry", 0)
         
         if arm_asym > self.HIGH_ASYMMETRY_THRESHOLD or leg_asym > self.HIGH_ASYMMETRY_THRESHOLD:
-            issues.append("asymmetry")
-            logger.debug(f"⚠️ Asymmetry detected: arms={arm_asym:.1f}%, legs={leg_asym:.1f}%")
+            issues |= 1 << ids["asymmetry"]
+            logger.debug("⚠️ Asymmetry detected: arms=%.1f%%, legs=%.1f%%", arm_asym, leg_asym)
         
         # Movement issues (THIS SHOULD WORK - you have movement data!)
         movement = frame_data.get("movement", {})
-        energy = movement.get("energy", "")
+        energy_level = movement.get("energy_level")
+        if energy_level is None:
+            energy_level = self._energy_level_from_label(movement.get("energy", ""))
         movement_score = movement.get("movement_score", 0)
         
-        if "Very High" in energy:
-            issues.append("high_energy")
+        if energy_level == EnergyLevel.VERY_HIGH:
+            issues |= 1 << ids["high_energy"]
             logger.debug("⚠️ Very high energy detected")
-        elif "Low" in energy and self.session.get_avg_energy() > 30:
-            issues.append("low_energy")
+        elif energy_level == EnergyLevel.LOW and self.session.get_avg_energy() > 30:
+            issues |= 1 << ids["low_energy"]
             logger.debug("⚠️ Low energy detected")
         
         # Add coaching trigger for initial movement to test the system
         if movement_score > 50:  # If there's significant movement
-            issues.append("movement_detected")
-            logger.debug(f"⚠️ Movement detected: score={movement_score:.1f}")
+            issues |= 1 << ids["movement_detected"]
+            logger.debug("⚠️ Movement detected: score=%.1f", movement_score)
         
         # Emotion-based coaching
-        emotion = frame_data.get("emotion", {})
-        if emotion.get("confidence", 0) > self.MIN_EMOTION_CONFIDENCE:
-            emotion_name = emotion.get("emotion", "").lower()
+        if emotion_conf > self.MIN_EMOTION_CONFIDENCE:
+            emotion_code = emotion.get("code")
+            if emotion_code is None:
+                emotion_code = self._emotion_code_from_label(emotion.get("emotion", ""))
             
-            if "sad" in emotion_name or "down" in emotion_name:
-                issues.append("low_confidence")
-                logger.debug(f"⚠️ Low confidence emotion: {emotion_name}")
-            elif "angry" in emotion_name or "frustrated" in emotion_name:
-                issues.append("frustration")
-                logger.debug(f"⚠️ Frustration detected: {emotion_name}")
+            if emotion_code == EmotionCode.SAD:
+                issues |= 1 << ids["low_confidence"]
+                logger.debug("⚠️ Low confidence emotion: %s", emotion.get("emotion"))
+            elif emotion_code == EmotionCode.ANGRY:
+                issues |= 1 << ids["frustration"]
+                logger.debug("⚠️ Frustration detected: %s", emotion.get("emotion"))
         
-        if issues:
-            logger.debug(f"📋 Total issues detected: {len(issues)}")
+        if issues and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📋 Total issues detected: %d", bin(issues).count("1"))
         
         return issues
     
-    def _check_persistence(self, issues: list) -> str:
+    def _check_persistence(self, issues: int) -> str:
         """
         Check if issue has been persistent across frames
         
         Args:
-            issues: List of current issues
+            issues: Bitmask of current issues
             
         Returns:
             Persistent issue name or empty string
         """
-        # Update consecutive counters
-        for issue in issues:
-            if issue not in self.consecutive_issues:
-                self.consecutive_issues[issue] = 1
-                logger.debug(f"📌 New issue tracked: {issue} (count=1)")
-            else:
-                self.consecutive_issues[issue] += 1
-                logger.debug(f"📌 Issue persists: {issue} (count={self.consecutive_issues[issue]})")
-        
-        # Clear non-present issues
-        for issue in list(self.consecutive_issues.keys()):
-            if issue not in issues:
-                logger.debug(f"✅ Issue resolved: {issue}")
-                del self.consecutive_issues[issue]
-        
-        # Limit dict size to prevent memory leak
-        if len(self.consecutive_issues) > 20:
-            # Remove oldest entries
-            sorted_issues = sorted(self.consecutive_issues.items(), key=lambda x: x[1])
-            for issue, _ in sorted_issues[:10]:
-                del self.consecutive_issues[issue]
-        
-        # Check for persistent issues (appeared in 5+ consecutive frames)
-        for issue, count in self.consecutive_issues.items():
-            if count >= 5:
-                logger.info(f"🚨 PERSISTENT ISSUE CONFIRMED: {issue} (appeared {count} times)")
-                # Reset counter to prevent immediate re-triggering
-                self.consecutive_issues[issue] = 0
-                return issue
-        
-        return ""
+        # Count up issues present this frame, reset the rest
+        present = (issues & self._ISSUE_BITS) != 0
+        counters = self._issue_counters
+        counters += present
+        counters[~present] = 0
+        
+        # Check for persistent issues (appeared in PERSISTENCE_FRAMES+ consecutive frames)
+        persistent = np.flatnonzero(counters >= self.PERSISTENCE_FRAMES)
+        if persistent.size == 0:
+            return ""
+        
+        issue_id = persistent[0]
+        issue = self.ISSUES[issue_id]
+        logger.info("🚨 PERSISTENT ISSUE CONFIRMED: %s (appeared %d times)", issue, counters[issue_id])
+        # Reset counter to prevent immediate re-triggering
+        counters[issue_id] = 0
+        return issue
+    
+    @staticmethod
+    def _energy_level_from_label(energy: str) -> EnergyLevel:
+        """EnergyLevel for frame data that only carries the display label"""
+        if "Very High" in energy:
+            return EnergyLevel.VERY_HIGH
+        if "Low" in energy:
+            return EnergyLevel.LOW
+        return EnergyLevel.UNKNOWN
+    
+    @staticmethod
+    def _emotion_code_from_label(emotion_name: str) -> EmotionCode:
+        """EmotionCode (of the ones coached on) for frame data with only the display label"""
+        emotion_name = emotion_name.lower()
+        if "sad" in emotion_name or "down" in emotion_name:
+            return EmotionCode.SAD
+        if "angry" in emotion_name or "frustrated" in emotion_name:
+            return EmotionCode.ANGRY
+        return EmotionCode.UNKNOWN
+    
+    def _issue_names(self, issues: int) -> list:
+        """Names of the issues set in a bitmask"""
+        return [issue for i, issue in enumerate(self.ISSUES) if issues >> i & 1]
     
     def _build_coaching_context(self, frame_data: Dict[str, Any], issue: str) -> Dict[str, Any]:
         """
@@ -284,10 +385,12 @@ class CoachEngine:
             "emotion": frame_data.get("emotion", {}),
             "balance": frame_data.get("balance", {}),
             "symmetry": frame_data.get("symmetry", {}),
+            "joints": frame_data.get("joints", {}),
+            "keypoints": frame_data.get("keypoints"),
             "issue": issue,
             "session_avg_energy": self.session.get_avg_energy(),
             "session_duration": self.session.get_duration()
         }
         
-        logger.debug(f"📋 Context created for issue '{issue}'")
+        logger.debug("📋 Context created for issue '%s'", issue)
         return context
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""
+Frame Pipeline
+Per-connection decode -> pose -> analysis pipeline over bounded asyncio queues
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class FramePipeline:
+    """
+    Runs incoming frames through three stages, one worker task each:
+    
+        decode -> pose detection -> posture/body analysis
+    
+    Stage work runs on the thread pool, so while one frame is in pose
+    inference the next can already be decoding. Stage queues are bounded and
+    drop their oldest frame when full: a client sending faster than the
+    server can analyze gets the freshest frames instead of a growing backlog.
+    """
+    
+    def __init__(self, decode: Callable[[Any], Any], detect: Callable[[Any], Any],
+                 analyze: Callable[[Any, Any, int], Optional[Dict[str, Any]]],
+                 executor: Optional[Executor] = None, maxsize: int = 2,
+                 release: Optional[Callable[[Any], None]] = None):
+        """
+        Args:
+            decode: payload -> frame (None if undecodable)
+            detect: frame -> detected keypoints (coroutine functions are awaited
+                directly instead of being sent to the thread pool)
+            analyze: (frame, keypoints, frame_count) -> frame_data (None on failure)
+            executor: Thread pool for stage work (None = the loop's default executor)
+            maxsize: Capacity of each stage queue
+            release: Called with each decoded frame once the pipeline is done
+                with it (analyzed, failed or dropped), e.g. to recycle its buffer
+        """
+        self.decode = decode
+        self.detect = detect
+        self.analyze = analyze
+        self.executor = executor
+        self.release = release
+        
+        self.q_decode = asyncio.Queue(maxsize=maxsize)
+        self.q_pose = asyncio.Queue(maxsize=maxsize)
+        self.q_analysis = asyncio.Queue(maxsize=maxsize)
+        self.q_out = asyncio.Queue(maxsize=maxsize)
+        
+        self._tasks: List[asyncio.Task] = []
+        
+        # Pipeline counters, for tuning queue sizes
+        self.frames_in = 0
+        self.frames_out = 0
+        self.frames_dropped = 0
+        self.e2e_latency = 0.0   # Submit -> result time of the last frame (s)
+        self.f2f_interval = 0.0  # Time between the last two results (s)
+        self._last_out: Optional[float] = None
+    
+    @property
+    def frames_in_flight(self) -> int:
+        """Frames submitted but neither delivered nor dropped yet"""
+        return self.frames_in - self.frames_out - self.frames_dropped
+    
+    def start(self):
+        """Start the stage workers"""
+        self._tasks = [
+            asyncio.create_task(self._decode_worker()),
+            asyncio.create_task(self._pose_worker()),
+            asyncio.create_task(self._analysis_worker()),
+        ]
+    
+    async def close(self):
+        """Stop the stage workers"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    def submit(self, payload: Union[bytes, str], frame_count: int):
+        """Queue a raw frame payload for processing (never blocks)"""
+        self.frames_in += 1
+        self._put_latest(self.q_decode, (frame_count, time.monotonic(), payload))
+    
+    async def get_result(self) -> Tuple[int, Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Wait for the next processed frame
+        
+        Returns:
+            (frame_count, frame_data, error) - error is "decode" or "analysis"
+            when the frame failed, with frame_data None
+        """
+        frame_count, submitted_at, frame_data, error = await self.q_out.get()
+        
+        now = time.monotonic()
+        self.frames_out += 1
+        self.e2e_latency = now - submitted_at
+        if self._last_out is not None:
+            self.f2f_interval = now - self._last_out
+        self._last_out = now
+        
+        return frame_count, frame_data, error
+    
+    def stats(self) -> Dict[str, Any]:
+        """Current pipeline counters"""
+        return {
+            "frames_in": self.frames_in,
+            "frames_out": self.frames_out,
+            "frames_dropped": self.frames_dropped,
+            "frames_in_flight": self.frames_in_flight,
+            "e2e_latency_ms": round(self.e2e_latency * 1000, 1),
+            "f2f_interval_ms": round(self.f2f_interval * 1000, 1),
+        }
+    
+    def _put_latest(self, queue: asyncio.Queue, item: Tuple):
+        """Put without waiting, evicting the oldest queued frame if full"""
+        if queue.full():
+            dropped = queue.get_nowait()
+            self.frames_dropped += 1
+            if queue is not self.q_decode:
+                self._release(dropped[2])
+            logger.debug("⏭️ Dropped frame %d (pipeline behind)", dropped[0])
+        queue.put_nowait(item)
+    
+    def _release(self, frame: Any):
+        """Hand a finished frame back to its owner"""
+        if self.release is not None:
+            self.release(frame)
+    
+    async def _run(self, func: Callable, *args):
+        """Run a stage function on the thread pool"""
+        if self.executor is None:
+            return await asyncio.to_thread(func, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+    
+    async def _decode_worker(self):
+        while True:
+            frame_count, submitted_at, payload = await self.q_decode.get()
+            frame = await self._run(self.decode, payload)
+            
+            if frame is None:
+                await self.q_out.put((frame_count, submitted_at, None, "decode"))
+                continue
+            
+            self._put_latest(self.q_pose, (frame_count, submitted_at, frame))
+    
+    async def _pose_worker(self):
+        while True:
+            frame_count, submitted_at, frame = await self.q_pose.get()
+            try:
+                if asyncio.iscoroutinefunction(self.detect):
+                    points = await self.detect(frame)
+                else:
+                    points = await self._run(self.detect, frame)
+            except Exception as e:
+                logger.error(f"❌ Pose detection failed for frame {frame_count}: {e}", exc_info=True)
+                self._release(frame)
+                await self.q_out.put((frame_count, submitted_at, None, "analysis"))
+                continue
+            
+            self._put_latest(self.q_analysis, (frame_count, submitted_at, frame, points))
+    
+    async def _analysis_worker(self):
+        while True:
+            frame_count, submitted_at, frame, points = await self.q_analysis.get()
+            try:
+                frame_data = await self._run(self.analyze, frame, points, frame_count)
+            finally:
+                self._release(frame)
+            
+            # Results are never dropped; a slow consumer holds the pipeline back
+            error = None if frame_data is not None else "analysis"
+            await self.q_out.put((frame_count, submitted_at, frame_data, error))
@@ -13,6 +13,9 @@ from google import genai
 from google.genai import types
 from dotenv import load_dotenv
 
+from src.services.asana_base import (NOSE, NECK, R_SHOULDER, L_SHOULDER, R_ELBOW, L_ELBOW,
+                                     R_HIP, L_HIP, R_KNEE, L_KNEE)
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
@@ -130,7 +133,7 @@ class GeminiClient:
         balance = context.get("balance", {})
         symmetry = context.get("symmetry", {})
         joints = context.get("joints", {})
-        keypoints = context.get("keypoints", {})
+        keypoints = context.get("keypoints")  # packed (18, 3) array
         frame_num = context.get("frame_num", 0)
         
         logger.debug(f"[BUILD_PROMPT] Context data extracted:")
@@ -140,7 +143,7 @@ class GeminiClient:
         logger.debug(f"  - Balance: {balance}")
         logger.debug(f"  - Symmetry: {symmetry}")
         logger.debug(f"  - Joints count: {len(joints)}")
-        logger.debug(f"  - Keypoints count: {len(keypoints)}")
+        logger.debug(f"  - Keypoints: {'none' if keypoints is None else keypoints.shape}")
         
         # ========================================
         # ASANA DETECTION
@@ -185,39 +188,15 @@ class GeminiClient:
         
         # Build keypoint positions summary (only key points)
         key_positions = []
-        important_points = ['Nose', 'Neck', 'RShoulder', 'LShoulder', 'RHip', 'LHip', 
-                          'RElbow', 'LElbow', 'RKnee', 'LKnee']
-        
-        logger.debug(f"[BUILD_PROMPT] Keypoints type: {type(keypoints)}")
-        logger.debug(f"[BUILD_PROMPT] Keypoints keys: {list(keypoints.keys()) if isinstance(keypoints, dict) else 'Not a dict'}")
+        important_points = [(NOSE, 'Nose'), (NECK, 'Neck'), (R_SHOULDER, 'RShoulder'), (L_SHOULDER, 'LShoulder'),
+                            (R_HIP, 'RHip'), (L_HIP, 'LHip'), (R_ELBOW, 'RElbow'), (L_ELBOW, 'LElbow'),
+                            (R_KNEE, 'RKnee'), (L_KNEE, 'LKnee')]
         
-        for point_name in important_points:
-            if point_name in keypoints:
-                kp = keypoints[point_name]
-                logger.debug(f"[BUILD_PROMPT] Processing {point_name}: type={type(kp)}, value={kp}")
-                
-                try:
-                    # Handle dict format (current format from main.py)
-                    if isinstance(kp, dict):
-                        x = kp.get('x', 0)
-                        y = kp.get('y', 0)
-                        conf = kp.get('confidence', 0)
-                        logger.debug(f"[BUILD_PROMPT] {point_name} dict format: x={x:.1f}, y={y:.1f}, conf={conf:.2f}")
-                        if conf > 0.2:  # confidence threshold
-                            key_positions.append(f"{point_name}:({x:.0f},{y:.0f})")
-                            logger.debug(f"[BUILD_PROMPT] Added {point_name} to positions (conf={conf:.2f})")
-                    # Handle tuple/list format (legacy)
-                    elif isinstance(kp, (tuple, list)) and len(kp) >= 3:
-                        x, y, conf = kp[0], kp[1], kp[2]
-                        logger.debug(f"[BUILD_PROMPT] {point_name} tuple/list format: x={x:.1f}, y={y:.1f}, conf={conf:.2f}")
-                        if conf > 0.2:  # confidence threshold
-                            key_positions.append(f"{point_name}:({x:.0f},{y:.0f})")
-                            logger.debug(f"[BUILD_PROMPT] Added {point_name} to positions (conf={conf:.2f})")
-                    else:
-                        logger.warning(f"[BUILD_PROMPT] Unexpected keypoint format for {point_name}: {type(kp)}")
-                except Exception as e:
-                    logger.error(f"[BUILD_PROMPT] Error processing keypoint {point_name}: {e}")
-                    logger.error(f"[BUILD_PROMPT] Traceback: {traceback.format_exc()}")
+        if keypoints is not None:
+            for joint, point_name in important_points:
+                x, y, conf = keypoints[joint]
+                if conf > 0.2:  # confidence threshold; NaN rows compare False
+                    key_positions.append(f"{point_name}:({x:.0f},{y:.0f})")
         
         positions_str = ", ".join(key_positions[:6]) if key_positions else "Limited keypoints detected"
         
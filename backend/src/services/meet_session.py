@@ -3,10 +3,12 @@ Video Meet Session Module
 Creates video meeting sessions and returns shareable links
 """
 
-import uuid
+import heapq
+import secrets
+import time
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from fastapi import HTTPException
 from dotenv import load_dotenv
 import os
@@ -20,12 +22,19 @@ WEBSOCKET_BASE_URL = os.getenv("WEBSOCKET_BASE_URL")
 class MeetSession:
     """Represents a video meet session"""
     
+    # Many sessions stay alive at once; no per-instance __dict__
+    __slots__ = ('session_id', 'host_id', 'created_at', 'expires_at', 'expires_at_ts',
+                 'participants', 'active')
+    
     def __init__(self, session_id: str, host_id: str):
         self.session_id = session_id
         self.host_id = host_id
         self.created_at = datetime.now()
         self.expires_at = self.created_at + timedelta(hours=2)
-        self.participants = []
+        # Epoch seconds, so sweeps compare floats against one time.time()
+        self.expires_at_ts = self.expires_at.timestamp()
+        # Participant ids in join order (dict as an ordered set: O(1) add/remove)
+        self.participants: Dict[str, None] = {}
         self.active = True
         
     def to_dict(self) -> Dict[str, Any]:
@@ -35,13 +44,13 @@ class MeetSession:
             "host_id": self.host_id,
             "created_at": self.created_at.isoformat(),
             "expires_at": self.expires_at.isoformat(),
-            "participants": self.participants,
+            "participants": list(self.participants),
             "active": self.active
         }
     
-    def is_expired(self) -> bool:
-        """Check if session has expired"""
-        return datetime.now() > self.expires_at
+    def is_expired(self, now: float) -> bool:
+        """Check if session has expired as of now (a time.time() value)"""
+        return now > self.expires_at_ts
 
 
 class VideoMeetManager:
@@ -50,6 +59,9 @@ class VideoMeetManager:
     def __init__(self, base_url: str = MEET_BASE_URL):
         self.base_url = base_url
         self.sessions: Dict[str, MeetSession] = {}
+        # (expires_at_ts, session_id) min-heap; a session's expiry never
+        # changes, so the head is always the next one to clean up
+        self._expiry_heap: List[Tuple[float, str]] = []
         logger.info("🎥 VideoMeetManager initialized")
     
     def create_session(self, host_id: Optional[str] = None) -> Dict[str, Any]:
@@ -62,16 +74,17 @@ class VideoMeetManager:
         Returns:
             Dictionary with session details and meeting link
         """
-        # Generate unique session ID
-        session_id = str(uuid.uuid4())
+        # Generate unique, URL-safe session ID (96 random bits)
+        session_id = secrets.token_urlsafe(12)
         
         # Use provided host_id or generate one
         if not host_id:
-            host_id = f"host_{uuid.uuid4().hex[:8]}"
+            host_id = f"host_{secrets.token_hex(4)}"
         
         # Create session
         session = MeetSession(session_id, host_id)
         self.sessions[session_id] = session
+        heapq.heappush(self._expiry_heap, (session.expires_at_ts, session_id))
         
         # Generate meeting link
         meeting_link = f"{self.base_url}/meet/{session_id}"
@@ -79,7 +92,7 @@ class VideoMeetManager:
         # Generate WebSocket endpoint for this session
         ws_endpoint = f"{WEBSOCKET_BASE_URL}/ws/meet/{session_id}"
         
-        logger.info(f"✅ Created video meet session: {session_id}")
+        logger.info("✅ Created video meet session: %s", session_id)
         
         return {
             "success": True,
@@ -97,8 +110,8 @@ class VideoMeetManager:
         """Get session by ID"""
         session = self.sessions.get(session_id)
         
-        if session and session.is_expired():
-            logger.info(f"⏰ Session {session_id} has expired")
+        if session and session.is_expired(time.time()):
+            logger.info("⏰ Session %s has expired", session_id)
             session.active = False
             return None
         
@@ -112,8 +125,8 @@ class VideoMeetManager:
             return False
         
         if participant_id not in session.participants:
-            session.participants.append(participant_id)
-            logger.info(f"👤 Added participant {participant_id} to session {session_id}")
+            session.participants[participant_id] = None
+            logger.info("👤 Added participant %s to session %s", participant_id, session_id)
         
         return True
     
@@ -121,31 +134,40 @@ class VideoMeetManager:
         """Remove participant from session"""
         session = self.get_session(session_id)
         
-        if session and participant_id in session.participants:
-            session.participants.remove(participant_id)
-            logger.info(f"👋 Removed participant {participant_id} from session {session_id}")
+        if session and session.participants.pop(participant_id, False) is None:
+            logger.info("👋 Removed participant %s from session %s", participant_id, session_id)
     
     def end_session(self, session_id: str):
         """End a session"""
         if session_id in self.sessions:
             self.sessions[session_id].active = False
-            logger.info(f"🛑 Ended session {session_id}")
+            logger.info("🛑 Ended session %s", session_id)
     
     def cleanup_expired(self):
-        """Remove expired sessions"""
-        expired = [sid for sid, session in self.sessions.items() 
-                   if session.is_expired()]
-        
-        for sid in expired:
-            del self.sessions[sid]
-            logger.info(f"🗑️ Cleaned up expired session {sid}")
-        
-        return len(expired)
+        """Remove expired sessions (only visits the ones that expired)"""
+        now = time.time()
+        heap = self._expiry_heap
+        expired = 0
+        
+        while heap and heap[0][0] < now:
+            _, sid = heapq.heappop(heap)
+            if self.sessions.pop(sid, None) is not None:
+                expired += 1
+                logger.info("🗑️ Cleaned up expired session %s", sid)
+        
+        return expired
+    
+    def get_session_count(self) -> int:
+        """Get number of active sessions (without building their dicts)"""
+        now = time.time()
+        return sum(1 for session in self.sessions.values()
+                   if session.active and not session.is_expired(now))
     
     def get_all_sessions(self) -> Dict[str, Dict[str, Any]]:
         """Get all active sessions"""
+        now = time.time()
         return {
             sid: session.to_dict() 
             for sid, session in self.sessions.items() 
-            if session.active and not session.is_expired()
+            if session.active and not session.is_expired(now)
         }
@@ -181,7 +181,7 @@ class PoseStateMachine:
         """
         self.asana_name = asana_name
         self.current_state = PoseState.INIT
-        self.state_entry_time = time.time()
+        self.state_entry_time = time.monotonic()
         self.motion_buffer = MotionBuffer(max_frames=60)
         
         # State history for debugging
@@ -341,7 +341,7 @@ class PoseStateMachine:
         Returns:
             Time in seconds
         """
-        return time.time() - self.state_entry_time
+        return time.monotonic() - self.state_entry_time
     
     def get_state_info(self) -> Dict:
         """
@@ -363,7 +363,7 @@ class PoseStateMachine:
     def reset(self):
         """Reset state machine to INIT"""
         self.current_state = PoseState.INIT
-        self.state_entry_time = time.time()
+        self.state_entry_time = time.monotonic()
         self.motion_buffer.clear()
         self.consecutive_stable_frames = 0
         self.consecutive_moving_frames = 0
@@ -0,0 +1,93 @@
+"""
+Result Sender
+Rate-limited, last-write-wins delivery of analysis messages to one client
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class LatestSender:
+    """
+    Sends at most max_hz messages per second, always the newest one
+    
+    A message replaced before it went out is dropped, except for its
+    carry-over keys (one-off feedback such as a Gemini reply): those ride
+    along on the replacing message unless it brings its own. After an idle
+    period the next message goes out immediately.
+    
+    If a send fails the sender marks itself closed and drops further
+    messages; callers should stop producing for it.
+    """
+    
+    def __init__(self, send: Callable[[Dict[str, Any]], Awaitable[None]],
+                 max_hz: float = 10.0, carry_keys: Sequence[str] = ()):
+        """
+        Args:
+            send: Coroutine function that delivers one message
+            max_hz: Most messages sent per second
+            carry_keys: Keys kept from replaced messages
+        """
+        self.send = send
+        self.interval = 1.0 / max_hz
+        self.carry_keys = tuple(carry_keys)
+        
+        self._latest: Optional[Dict[str, Any]] = None
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        
+        self.messages_sent = 0
+        self.messages_coalesced = 0
+    
+    def start(self):
+        """Start the sender task"""
+        self._task = asyncio.create_task(self._run())
+    
+    async def close(self):
+        """Stop the sender task; a pending message is discarded"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+    @property
+    def closed(self) -> bool:
+        """True once a send has failed; the connection is unusable"""
+        return self._closed
+    
+    def update(self, message: Dict[str, Any]):
+        """Make message the next one to send (never blocks); dropped once closed"""
+        if self._closed:
+            return
+        
+        previous = self._latest
+        if previous is not None:
+            self.messages_coalesced += 1
+            for key in self.carry_keys:
+                if key in previous and key not in message:
+                    message[key] = previous[key]
+        
+        self._latest = message
+        self._ready.set()
+    
+    async def _run(self):
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            
+            message, self._latest = self._latest, None
+            try:
+                await self.send(message)
+            except Exception as e:
+                logger.warning("📴 Result sender stopped, send failed: %s: %s", type(e).__name__, e)
+                self._closed = True
+                self._latest = None
+                return
+            self.messages_sent += 1
+            
+            # Newer messages collect in _latest meanwhile
+            await asyncio.sleep(self.interval)
@@ -14,7 +14,7 @@ logger = logging.getLogger(__name__)
 class Session:
     """Individual user session state"""
     
-    def __init__(self, session_id: int):
+    def __init__(self, session_id: str):
         self.id = session_id
         self.start_time = time.time()
         
@@ -107,20 +107,20 @@ class SessionManager:
     """Manages all active sessions"""
     
     def __init__(self):
-        self.sessions: Dict[int, Session] = {}
+        self.sessions: Dict[str, Session] = {}
         logger.info("📋 SessionManager initialized")
     
-    def create_session(self, session_id: int) -> Session:
+    def create_session(self, session_id: str) -> Session:
         """Create new session"""
         session = Session(session_id)
         self.sessions[session_id] = session
         return session
     
-    def get_session(self, session_id: int) -> Optional[Session]:
+    def get_session(self, session_id: str) -> Optional[Session]:
         """Get session by ID"""
         return self.sessions.get(session_id)
     
-    def remove_session(self, session_id: int):
+    def remove_session(self, session_id: str):
         """Remove session and log final stats"""
         if session_id in self.sessions:
             session = self.sessions[session_id]
@@ -139,6 +139,6 @@ class SessionManager:
         """Get number of active sessions"""
         return len(self.sessions)
     
-    def get_all_stats(self) -> Dict[int, Dict[str, Any]]:
+    def get_all_stats(self) -> Dict[str, Dict[str, Any]]:
         """Get stats for all sessions"""
         return {sid: session.get_stats() for sid, session in self.sessions.items()}
\ No newline at end of file
@@ -14,7 +14,7 @@ Key principles:
 
 import logging
 import time
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional
 from collections import deque
 
 from src.services.asana_registry import get_asana
@@ -97,7 +97,7 @@ class YogaCoachEngine:
         
         Args:
             frame_data: Frame analysis data containing:
-                - keypoints: Dict of keypoint positions
+                - keypoints: Packed (18, 3) keypoint array
                 - joints: Dict of joint angles
                 - frame_num: Frame number
             timestamp: Frame timestamp
@@ -158,11 +158,8 @@ class YogaCoachEngine:
                 "message": f"Holding {self.current_asana.name}..." if self.current_asana else "In pose..."
             }
         
-        # Evaluate alignment
-        keypoints = frame_data.get('keypoints', [])
-        keypoints_dict = self._convert_keypoints(keypoints)
-        
-        errors = self.current_asana.evaluate_alignment(joint_angles, keypoints_dict)
+        # Evaluate alignment on the packed keypoint array
+        errors = self.current_asana.evaluate_alignment(joint_angles, frame_data['keypoints'])
         
         # Track error persistence
         self._update_error_persistence(errors)
@@ -201,31 +198,6 @@ class YogaCoachEngine:
             "state_info": state_info
         }
     
-    def _convert_keypoints(self, keypoints: list) -> Dict[str, Tuple[float, float, float]]:
-        """
-        Convert keypoints list to dictionary
-        
-        Args:
-            keypoints: List of keypoint dicts with x, y, confidence
-            
-        Returns:
-            Dict mapping keypoint name to (x, y, confidence)
-        """
-        # OpenPose COCO keypoint names
-        KEYPOINT_NAMES = [
-            "Nose", "Neck", "RShoulder", "RElbow", "RWrist",
-            "LShoulder", "LElbow", "LWrist", "RHip", "RKnee",
-            "RAnkle", "LHip", "LKnee", "LAnkle", "REye",
-            "LEye", "REar", "LEar"
-        ]
-        
-        result = {}
-        for i, kp in enumerate(keypoints):
-            if kp is not None and i < len(KEYPOINT_NAMES):
-                result[KEYPOINT_NAMES[i]] = (kp['x'], kp['y'], kp['confidence'])
-        
-        return result
-    
     def _update_error_persistence(self, errors: list):
         """
         Update error persistence tracking
@@ -0,0 +1,75 @@
+"""
+Rule-table asana detection
+"""
+
+import unittest
+
+import numpy as np
+
+from src.config.asana_definitions import ASANA_DEFINITIONS, evaluate_rules
+from src.services.asana_base import NECK, R_HIP, L_HIP, R_ANKLE, L_ANKLE
+from src.services.asana_detector import AsanaDetector
+
+
+def packed_keypoints(points: dict) -> np.ndarray:
+    """(18, 3) keypoint array with the given (x, y) points, NaN elsewhere"""
+    keypoints = np.full((18, 3), np.nan, dtype=np.float32)
+    for joint, (x, y) in points.items():
+        keypoints[joint] = (x, y, 0.9)
+    return keypoints
+
+
+def rule_results(asana_name: str, features: np.ndarray) -> dict:
+    """{rule name: passed} for one asana"""
+    rules = ASANA_DEFINITIONS[asana_name]['detection_rules']
+    return dict(zip(rules['name'].tolist(), evaluate_rules(rules, features).tolist()))
+
+
+class AsanaDetectionTest(unittest.TestCase):
+    
+    def test_tree_pose(self):
+        keypoints = packed_keypoints({NECK: (320, 120), R_HIP: (300, 280), L_HIP: (340, 285),
+                                      R_ANKLE: (305, 460), L_ANKLE: (330, 300)})
+        joints = {'RKnee': 172, 'LKnee': 55}
+        balance = {'balance_score': 70}
+        posture = {'angle': 88}
+        
+        features = AsanaDetector.detection_features(keypoints, joints, balance, posture)
+        # The leg rules read the joint angles (they always failed before the rule table)
+        self.assertEqual(rule_results('tree_pose', features), {
+            'has_straight_leg': True, 'has_bent_leg': True, 'hips_level': True, 'balance_required': True
+        })
+        
+        self.assertEqual(AsanaDetector().detect_asana(keypoints, joints, balance, posture), ('tree_pose', 1.0))
+    
+    def test_warrior_2(self):
+        keypoints = packed_keypoints({NECK: (320, 120), R_HIP: (300, 280), L_HIP: (340, 280),
+                                      R_ANKLE: (150, 460), L_ANKLE: (500, 460)})
+        joints = {'RKnee': 95, 'LKnee': 175, 'RElbow': 172, 'LElbow': 170, 'RShoulder': 90, 'LShoulder': 92}
+        balance = {'balance_score': 30}
+        posture = {'angle': 85}
+        
+        features = AsanaDetector.detection_features(keypoints, joints, balance, posture)
+        self.assertEqual(rule_results('warrior_2', features), {
+            'front_knee_bent': True, 'back_leg_straight': True, 'arms_extended': True, 'wide_stance': True
+        })
+        # Arms out to the sides, not overhead
+        self.assertFalse(rule_results('warrior_1', features)['arms_raised'])
+        # Straight elbows now count towards downward dog's arms_straight
+        self.assertTrue(rule_results('downward_dog', features)['arms_straight'])
+        
+        self.assertEqual(AsanaDetector().detect_asana(keypoints, joints, balance, posture), ('warrior_2', 1.0))
+    
+    def test_no_pose_data(self):
+        features = AsanaDetector.detection_features(None, {}, {}, {})
+        
+        # Missing knees read as 0°, so only the "bent leg" rules can pass
+        self.assertEqual(rule_results('tree_pose', features), {
+            'has_straight_leg': False, 'has_bent_leg': True, 'hips_level': True, 'balance_required': False
+        })
+        self.assertFalse(rule_results('downward_dog', features)['hips_elevated'])
+        self.assertFalse(rule_results('mountain_pose', features)['upright'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+Gemini prompt building from the /ws/meet frame context
+"""
+
+import unittest
+
+import numpy as np
+
+from src.services.asana_base import NOSE, NECK, R_SHOULDER, L_SHOULDER, R_HIP, L_HIP
+
+try:
+    from src.services.gemini_ws import GeminiClient
+except ImportError:  # google-genai / python-dotenv not installed
+    GeminiClient = None
+
+
+def meet_context() -> dict:
+    """Context shaped like the one the meet handler sends every 30th frame"""
+    keypoints = np.full((18, 3), np.nan, dtype=np.float32)
+    keypoints[NOSE] = (320, 80, 0.9)
+    keypoints[NECK] = (320, 140, 0.9)
+    keypoints[R_SHOULDER] = (280, 140, 0.8)
+    keypoints[L_SHOULDER] = (360, 140, 0.1)  # below the prompt's confidence gate
+    keypoints[R_HIP] = (300, 300, 0.8)
+    keypoints[L_HIP] = (340, 300, 0.8)
+    
+    return {
+        "posture": {"status": "Good", "angle": 85.0},
+        "movement": {"energy": "Low"},
+        "emotion": {"emotion": "Neutral"},
+        "balance": {"balance_score": 60.0},
+        "symmetry": {"arm_symmetry": 5.0, "leg_symmetry": 3.0},
+        "joints": {"right_knee": 170.0, "left_knee": 168.0},
+        "keypoints": keypoints,
+        "frame_num": 30
+    }
+
+
+@unittest.skipIf(GeminiClient is None, "google-genai / python-dotenv not installed")
+class BuildPromptTest(unittest.TestCase):
+    
+    def test_packed_keypoints(self):
+        prompt = GeminiClient()._build_prompt(meet_context())
+        
+        self.assertIn("Nose:(320,80)", prompt)
+        self.assertIn("RShoulder:(280,140)", prompt)
+        self.assertNotIn("LShoulder", prompt)
+        self.assertNotIn("REye", prompt)
+        self.assertIn("right_knee: 170°", prompt)
+    
+    def test_missing_keypoints(self):
+        context = meet_context()
+        context["keypoints"] = None
+        
+        prompt = GeminiClient()._build_prompt(context)
+        
+        self.assertIn("Limited keypoints detected", prompt)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+"""
+Pose state machine timing
+"""
+
+import time
+import unittest
+
+from src.services.pose_state_machine import PoseStateMachine
+
+
+class PoseStateMachineTimingTest(unittest.TestCase):
+    """Frame timestamps are time.monotonic(); state times must use the same clock"""
+    
+    def test_time_in_state_after_init(self):
+        machine = PoseStateMachine('tree_pose')
+        
+        self.assertLess(abs(machine.get_state_info()['time_in_state']), 1.0)
+    
+    def test_time_in_state_after_updates(self):
+        machine = PoseStateMachine('tree_pose')
+        start = time.monotonic()
+        for i in range(10):
+            machine.update({'right_knee': 170.0, 'left_knee': 60.0}, start + i * 0.1)
+        
+        self.assertLess(abs(machine.get_state_info()['time_in_state']), 2.0)
+    
+    def test_time_in_state_after_reset(self):
+        machine = PoseStateMachine('tree_pose')
+        machine.update({'right_knee': 170.0}, time.monotonic())
+        machine.reset()
+        
+        self.assertLess(abs(machine.get_state_info()['time_in_state']), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
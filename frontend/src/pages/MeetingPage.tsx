@@ -4,6 +4,10 @@ import { BACKEND_URL, WS_BASE_URL, POSE_PAIRS } from '../config';
 import type { KeyPoint, AnalysisData, Stats, FeedbackItem, ConnectionStatus } from '../types';
 
 
+// Detected keypoint above the drawing/logging confidence threshold
+const isConfident = (kp: KeyPoint | undefined): kp is [number, number, number] =>
+  kp !== undefined && kp[2] !== null && kp[2] > 0.2;
+
 interface MeetingPageProps {
   sessionId: string;
   onNavigate: (path: string) => void;
@@ -60,7 +64,7 @@ const MeetingPage: React.FC<MeetingPageProps> = ({ sessionId, onNavigate }) => {
   }, [sessionId, onNavigate]);
 
   // Draw pose skeleton on overlay canvas
-  const drawSkeleton = useCallback((ctx: CanvasRenderingContext2D, keypoints: (KeyPoint | null)[]) => {
+  const drawSkeleton = useCallback((ctx: CanvasRenderingContext2D, keypoints: KeyPoint[]) => {
     if (!keypoints || keypoints.length === 0) return;
 
     const canvas = overlayCanvasRef.current;
@@ -86,10 +90,10 @@ const MeetingPage: React.FC<MeetingPageProps> = ({ sessionId, onNavigate }) => {
     POSE_PAIRS.forEach(([i, j]) => {
       const ptA = keypoints[i];
       const ptB = keypoints[j];
-      if (ptA && ptB && ptA.confidence > 0.2 && ptB.confidence > 0.2) {
+      if (isConfident(ptA) && isConfident(ptB)) {
         ctx.beginPath();
-        ctx.moveTo(ptA.x * scaleX, ptA.y * scaleY);
-        ctx.lineTo(ptB.x * scaleX, ptB.y * scaleY);
+        ctx.moveTo(ptA[0] * scaleX, ptA[1] * scaleY);
+        ctx.lineTo(ptB[0] * scaleX, ptB[1] * scaleY);
         ctx.stroke();
       }
     });
@@ -97,9 +101,9 @@ const MeetingPage: React.FC<MeetingPageProps> = ({ sessionId, onNavigate }) => {
     // Draw keypoints as circles
     ctx.shadowBlur = 15;
     keypoints.forEach((point) => {
-      if (point && point.confidence > 0.2) {
+      if (isConfident(point)) {
         // Color code by confidence level
-        const confidence = point.confidence;
+        const confidence = point[2];
         if (confidence > 0.7) {
           ctx.fillStyle = '#ff0000'; // High confidence - red
           ctx.shadowColor = '#ff0000';
@@ -112,7 +116,7 @@ const MeetingPage: React.FC<MeetingPageProps> = ({ sessionId, onNavigate }) => {
         }
 
         ctx.beginPath();
-        ctx.arc(point.x * scaleX, point.y * scaleY, 6, 0, 2 * Math.PI);
+        ctx.arc(point[0] * scaleX, point[1] * scaleY, 6, 0, 2 * Math.PI);
         ctx.fill();
       }
     });
@@ -168,11 +172,6 @@ const MeetingPage: React.FC<MeetingPageProps> = ({ sessionId, onNavigate }) => {
           return;
         }
 
-        // Handle pong
-        if (response.type === 'pong') {
-          return;
-        }
-
         // Handle analysis data from OpenPose
         if (response.type === 'analysis' && response.data) {
           const data: AnalysisData = response.data;
@@ -194,9 +193,9 @@ const MeetingPage: React.FC<MeetingPageProps> = ({ sessionId, onNavigate }) => {
             const timestamp = new Date().toLocaleTimeString();
             const validKeypoints = data.keypoints
               .map((kp, idx) => {
-                if (kp && kp.confidence > 0.2) {
+                if (isConfident(kp)) {
                   const pointNames = ['Nose', 'Neck', 'RShoulder', 'RElbow', 'RWrist', 'LShoulder', 'LElbow', 'LWrist', 'RHip', 'RKnee', 'RAnkle', 'LHip', 'LKnee', 'LAnkle', 'REye', 'LEye', 'REar', 'LEar'];
-                  return `${pointNames[idx]}: (${kp.x.toFixed(1)}, ${kp.y.toFixed(1)}) [${(kp.confidence * 100).toFixed(0)}%]`;
+                  return `${pointNames[idx]}: (${kp[0].toFixed(1)}, ${kp[1].toFixed(1)}) [${(kp[2] * 100).toFixed(0)}%]`;
                 }
                 return null;
               })
@@ -2,16 +2,13 @@
 // TYPE DEFINITIONS
 // ============================================================================
 
-export interface KeyPoint {
-  x: number;
-  y: number;
-  confidence: number;
-}
+// One keypoint row: [x, y, confidence], all null when the point was not detected
+export type KeyPoint = [number, number, number] | [null, null, null];
 
 export interface AnalysisData {
   frame_num: number;
   timestamp: number;
-  keypoints: (KeyPoint | null)[];
+  keypoints: KeyPoint[];
   joints: Record<string, number>;
   symmetry: Record<string, number>;
   balance: {
@@ -46,10 +43,11 @@ export interface CoachingFeedback {
 }
 
 export interface WebSocketMessage {
-  type: 'welcome' | 'analysis' | 'error' | 'pong';
+  type: 'welcome' | 'analysis' | 'error';
   message?: string;
   data?: AnalysisData;
   coaching?: CoachingFeedback;
+  dropped_frames?: number;  // Frames the server skipped to keep up
   session_id?: string;
   participant_id?: string;
 }